@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:02:37 2026
+
+Test cases for the benchmark suite
+
+"""
+from tic_tac_toe.benchmark.suite import compare_results, run_suite
+
+
+def test_run_suite():
+    results = run_suite(trees=['ab_pruning', 'monte_carlo'], sizes=[3],
+                        lengths=[3, 4], starts=['center'],
+                        tree_kwargs={'monte_carlo': {'iterations': 50, 'seed': 0}})
+
+    # the length 4 is skipped on a 3x3 board
+    assert [x['tree'] for x in results] == ['ab_pruning', 'monte_carlo']
+    for result in results:
+        assert result['start'] == 'center'
+        assert result['nodes'] > 1
+        assert result['peak_memory'] > 0
+    assert results[1]['simulations'] == 50
+
+
+def test_compare_results():
+    case = {'tree': 'minimax', 'size': 3, 'length': 3, 'start': 'empty'}
+    baseline = [dict(case, build_time=1.0, nodes_per_second=100.0,
+                     peak_memory=1000)]
+    results = [dict(case, build_time=1.05, nodes_per_second=50.0,
+                    peak_memory=2000)]
+
+    regressions = compare_results(results, baseline, threshold=0.1)
+    assert sorted(x['metric'] for x in regressions) == ['nodes_per_second',
+                                                        'peak_memory']
+    assert compare_results(results, baseline, threshold=1.5) == []
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:12:40 2026
+
+Test cases for the command line arguments
+
+"""
+import sys
+
+import pytest
+
+from tic_tac_toe import init_args
+
+
+def _parse(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['tic_tac_toe', *args])
+    return init_args()
+
+
+def test_workers(monkeypatch):
+    assert _parse(monkeypatch, '-t', 'monte_carlo', '-w', '2').workers == 2
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, '-t', 'minimax', '-w', '2')
+
+
+def test_retrograde_depth_limit(monkeypatch):
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, '-t', 'retrograde', '-d', '2')
+
+
+def test_retrograde_size(monkeypatch):
+    assert _parse(monkeypatch, '-t', 'retrograde', '-s', '4', '-l', '3').size == 4
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, '-t', 'retrograde', '-s', '5', '-l', '4')
+
+
+def test_depth_limit(monkeypatch):
+    for tree in ('minimax', 'negamax', 'ab_pruning'):
+        assert _parse(monkeypatch, '-t', tree, '-d', '2').depth_limit == 2
+
+    # the trees not scoring the nodes at the depth limit by the evaluation
+    for tree in ('ab_depth_first', 'monte_carlo'):
+        with pytest.raises(SystemExit):
+            _parse(monkeypatch, '-t', tree, '-d', '2')
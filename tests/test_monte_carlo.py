@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:02:15 2026
+
+Test cases for the components of MonteCarloTree
+
+"""
+import pickle
+import random
+
+from tic_tac_toe.tree.monte_carlo import (MonteCarloTree, _Statistics,
+                                          play_batch, play_randomly)
+from tic_tac_toe.winning_lines import get_winning_lines
+
+
+def _keep_order(empty_bits):
+    "a shuffle keeping the given order of the moves"
+    return
+
+
+def test_play_randomly():
+    masks_through = get_winning_lines(3, 3).masks_through
+
+    # the first player completes the first row
+    assert play_randomly(0, 0, 1, [0, 3, 1, 4, 2, 5, 6, 7, 8], masks_through,
+                         _keep_order) == 1
+    assert play_randomly(0, 0, -1, [0, 3, 1, 4, 2, 5, 6, 7, 8], masks_through,
+                         _keep_order) == -1
+
+    # X O X / X O O / O X X
+    assert play_randomly(0, 0, 1, [0, 1, 2, 4, 3, 5, 7, 6, 8], masks_through,
+                         _keep_order) == 0
+
+    # MAX to move on the second row, MIN has to block the first row
+    own, other = 0b000011000, 0b000000011
+    assert play_randomly(own, other, 1, [5, 2, 6, 7, 8], masks_through,
+                         _keep_order) == 1
+    assert play_randomly(other, own, -1, [2, 5, 6, 7, 8], masks_through,
+                         _keep_order) == -1
+
+
+def test_play_batch():
+    state = (0, 0, 1, [0, 3, 1, 4, 2, 5, 6, 7, 8])
+    assert play_batch(state, 3, 3, 5, _keep_order) == [0, 5, 0]
+
+
+def _create_statistics(*simulations):
+    return [_Statistics(None, list(x)) for x in simulations]
+
+
+def test_select_child_unvisited():
+    children = _create_statistics([0, 1, 3], [0, 0, 0], [2, 0, 0])
+    assert MonteCarloTree._select_child(children, 1, 1.41) is children[1]
+    assert MonteCarloTree._select_child(children, -1, 0) is children[1]
+
+
+def test_select_child_uct():
+    # the rate of wins, a draw counts as a win
+    children = _create_statistics([0, 1, 3], [0, 3, 1], [2, 0, 0])
+    assert MonteCarloTree._select_child(children, 1, 0) is children[1]
+    assert MonteCarloTree._select_child(children, -1, 0) is children[0]
+
+    # the exploration term prefers the child with fewer rollouts
+    children = _create_statistics([0, 9, 1], [0, 0, 1])
+    assert MonteCarloTree._select_child(children, 1, 0) is children[0]
+    assert MonteCarloTree._select_child(children, 1, 2) is children[1]
+
+
+def test_backpropagate():
+    path = _create_statistics([0, 0, 0], [1, 2, 0], [0, 1, 1])
+    other = _create_statistics([3, 0, 0])
+    MonteCarloTree._backpropagate(path, [1, 2, 3])
+
+    # every node on the path, and only them
+    assert [x.simulation for x in path] == [[1, 2, 3], [2, 4, 3], [1, 3, 4]]
+    assert other[0].simulation == [3, 0, 0]
+
+
+def test_backpropagate_shared_scores():
+    tree = MonteCarloTree(iterations=20, seed=0)
+    path = tree._select_path()
+    before = [list(tree.get_simulation(x.node)) for x in path]
+    tree._backpropagate(path, [0, 1, 0])
+
+    # the statistics share the simulation results in tree.scores
+    assert [tree.get_simulation(x.node) for x in path] == [
+        [draw, win + 1, lose] for draw, win, lose in before]
+
+
+def test_play_batch_seeded():
+    # the empty bits are shuffled in place
+    results = [play_batch((0, 0, 1, list(range(9))), 3, 3, 50,
+                          random.Random(7).shuffle) for _ in range(2)]
+    assert results[0] == results[1]
+    assert sum(results[0]) == 50
+
+    # the seeded shuffle is sent to the workers of the tree-parallel search
+    func_shuffle = pickle.loads(pickle.dumps(random.Random(7).shuffle))
+    assert play_batch((0, 0, 1, list(range(9))), 3, 3, 50,
+                      func_shuffle) == results[0]
@@ -105,3 +105,23 @@ def test_node_termination_winner_b():
         node = Node(data=data, turn=-1)
         assert node.terminated == True
         assert node.winner == -1
+
+
+# symmetric boards should have the same canonical key
+def test_canonical_key():
+    data = [[1, -1, 0], [0, 0, 0], [0, 0, 0]]
+    rotated = [[0, 0, 1], [0, 0, -1], [0, 0, 0]]
+    mirrored = [[0, -1, 1], [0, 0, 0], [0, 0, 0]]
+    other = [[1, 0, 0], [0, -1, 0], [0, 0, 0]]
+    key = Node(data=data).canonical_key
+    assert Node(data=rotated).canonical_key == key
+    assert Node(data=mirrored).canonical_key == key
+    assert Node(data=other).canonical_key != key
+
+
+def test_unique_children():
+    root = Node()
+
+    # a corner, an edge and the center
+    assert len(root.unique_children()) == 3
+    assert len(root.expand()) == 9
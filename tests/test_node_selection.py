@@ -9,7 +9,9 @@ from tic_tac_toe.node import Node
 from tic_tac_toe.tree.basic_game_tree import BasicGameTree
 from tic_tac_toe.tree.negamax_tree import NegamaxGameTree
 from tic_tac_toe.tree.alpha_beta_pruning import AlphaBetaPruningTree
+from tic_tac_toe.tree.depth_first_alpha_beta import DepthFirstAlphaBetaTree
 from tic_tac_toe.tree.monte_carlo import MonteCarloTree
+from tic_tac_toe.tree.tablebase_tree import TablebaseTree
 from tic_tac_toe.node_selector import NodeSelector
 
 
@@ -34,12 +36,12 @@ def _print_possible_paths(paths):
 
 
 # test the node selection of states with MAX advantageous
-def _node_selection_max(clazz):
+def _node_selection_max(clazz, **kwargs):
     for data in DATA_LS_MAX:
         root = Node(data=data, turn=1)
         possible_paths = set()
         for i in range(100):
-            tree = clazz(root)
+            tree = clazz(root, **kwargs)
             selector = NodeSelector(tree)
             path = selector.get_path(root)
             possible_paths.add(tuple(path))
@@ -53,12 +55,12 @@ def _node_selection_max(clazz):
 
 
 # test the node selection of states with MIN advantageous
-def _node_selection_min(clazz):
+def _node_selection_min(clazz, **kwargs):
     for data in DATA_LS_MIN:
         root = Node(data=data, turn=-1)
         possible_paths = set()
         for i in range(100):
-            tree = clazz(root)
+            tree = clazz(root, **kwargs)
             selector = NodeSelector(tree)
             path = selector.get_path(root)
             node = path[-1]
@@ -79,6 +81,54 @@ def test_minimax_min():
     _node_selection_min(BasicGameTree)
 
 
+def test_minimax_transposition_max():
+    _node_selection_max(BasicGameTree, transposition=True)
+
+
+def test_minimax_transposition_min():
+    _node_selection_min(BasicGameTree, transposition=True)
+
+
+def test_minimax_symmetry_max():
+    _node_selection_max(BasicGameTree, symmetry=True)
+
+
+def test_minimax_symmetry_min():
+    _node_selection_min(BasicGameTree, symmetry=True)
+
+
+def test_minimax_array_max():
+    _node_selection_max(BasicGameTree, storage='array')
+
+
+def test_minimax_array_min():
+    _node_selection_min(BasicGameTree, storage='array')
+
+
+def test_minimax_stream_max():
+    _node_selection_max(BasicGameTree, storage='stream')
+
+
+def test_minimax_stream_min():
+    _node_selection_min(BasicGameTree, storage='stream')
+
+
+def test_negamax_stream_max():
+    _node_selection_max(NegamaxGameTree, storage='stream')
+
+
+def test_negamax_stream_min():
+    _node_selection_min(NegamaxGameTree, storage='stream')
+
+
+def test_minimax_depth_limit_max():
+    _node_selection_max(BasicGameTree, depth_limit=3)
+
+
+def test_minimax_depth_limit_min():
+    _node_selection_min(BasicGameTree, depth_limit=3)
+
+
 def test_negamax_max():
     _node_selection_max(NegamaxGameTree)
 
@@ -87,6 +137,22 @@ def test_negamax_min():
     _node_selection_min(NegamaxGameTree)
 
 
+def test_negamax_transposition_max():
+    _node_selection_max(NegamaxGameTree, transposition=True)
+
+
+def test_negamax_transposition_min():
+    _node_selection_min(NegamaxGameTree, transposition=True)
+
+
+def test_negamax_array_max():
+    _node_selection_max(NegamaxGameTree, storage='array')
+
+
+def test_negamax_array_min():
+    _node_selection_min(NegamaxGameTree, storage='array')
+
+
 def test_ab_pruning_max():
     _node_selection_max(AlphaBetaPruningTree)
 
@@ -95,6 +161,46 @@ def test_ab_pruning_min():
     _node_selection_min(AlphaBetaPruningTree)
 
 
+def test_ab_pruning_depth_limit_max():
+    _node_selection_max(AlphaBetaPruningTree, depth_limit=3)
+
+
+def test_ab_pruning_depth_limit_min():
+    _node_selection_min(AlphaBetaPruningTree, depth_limit=3)
+
+
+def test_ab_pruning_symmetry_max():
+    _node_selection_max(AlphaBetaPruningTree, symmetry=True)
+
+
+def test_ab_pruning_symmetry_min():
+    _node_selection_min(AlphaBetaPruningTree, symmetry=True)
+
+
+def test_ab_depth_first_max():
+    _node_selection_max(DepthFirstAlphaBetaTree)
+
+
+def test_ab_depth_first_min():
+    _node_selection_min(DepthFirstAlphaBetaTree)
+
+
+def test_ab_depth_first_time_limit_max():
+    _node_selection_max(DepthFirstAlphaBetaTree, time_limit=0.5)
+
+
+def test_ab_depth_first_time_limit_min():
+    _node_selection_min(DepthFirstAlphaBetaTree, time_limit=0.5)
+
+
+def test_retrograde_max():
+    _node_selection_max(TablebaseTree)
+
+
+def test_retrograde_min():
+    _node_selection_min(TablebaseTree)
+
+
 def test_monte_carlo_max():
     _node_selection_max(MonteCarloTree)
 
@@ -9,8 +9,11 @@ from tic_tac_toe.node import Node
 from tic_tac_toe.tree.alpha_beta_pruning import BasicGameTree
 from tic_tac_toe.tree.negamax_tree import NegamaxGameTree
 from tic_tac_toe.tree.alpha_beta_pruning import AlphaBetaPruningTree
+from tic_tac_toe.tree.depth_first_alpha_beta import DepthFirstAlphaBetaTree
 from tic_tac_toe.tree.monte_carlo import MonteCarloTree
+from tic_tac_toe.tree.tablebase_tree import TablebaseTree
 from tic_tac_toe.node_selector import NodeSelector
+from tic_tac_toe.tablebase import get_tablebase
 
 
 def _base_test_draw(clazz, **kwargs):
@@ -30,14 +33,78 @@ def test_minimax_draw():
     _base_test_draw(BasicGameTree)
 
 
+def test_minimax_transposition_draw():
+    _base_test_draw(BasicGameTree, transposition=True)
+
+
+def test_minimax_symmetry_draw():
+    _base_test_draw(BasicGameTree, symmetry=True)
+
+
+def test_minimax_array_draw():
+    _base_test_draw(BasicGameTree, storage='array')
+
+
+def test_minimax_stream_draw():
+    _base_test_draw(BasicGameTree, storage='stream')
+
+
+def test_minimax_depth_limit_draw():
+    _base_test_draw(BasicGameTree, depth_limit=3)
+
+
 def test_negamax_draw():
     _base_test_draw(NegamaxGameTree)
 
 
+def test_negamax_transposition_draw():
+    _base_test_draw(NegamaxGameTree, transposition=True)
+
+
+def test_negamax_array_draw():
+    _base_test_draw(NegamaxGameTree, storage='array')
+
+
 def test_ab_pruning_draw():
     _base_test_draw(AlphaBetaPruningTree)
 
 
+def test_ab_pruning_expanded_root():
+    "the root made by expand_one has a parent out of the tree"
+    tablebase = get_tablebase(3, 3)
+    for moves in [[(1, 1)], [(0, 1)], [(0, 1), (0, 0)], [(0, 0), (1, 1), (2, 2)],
+                  [(0, 0), (0, 1), (1, 1)]]:
+        root = Node()
+        for index in moves:
+            root = root.expand_one(index)
+        tree = AlphaBetaPruningTree(root)
+        assert tree.get_score(root) == tablebase.get_score(root)
+
+        # the best play reaches the score of the tablebase
+        path = NodeSelector(tree).get_path(root)
+        assert path[-1].winner == tablebase.get_score(root)
+
+
+def test_ab_pruning_depth_limit_draw():
+    _base_test_draw(AlphaBetaPruningTree, depth_limit=3)
+
+
+def test_ab_pruning_symmetry_draw():
+    _base_test_draw(AlphaBetaPruningTree, symmetry=True)
+
+
+def test_ab_depth_first_draw():
+    _base_test_draw(DepthFirstAlphaBetaTree)
+
+
+def test_ab_depth_first_time_limit_draw():
+    _base_test_draw(DepthFirstAlphaBetaTree, time_limit=0.5)
+
+
+def test_retrograde_draw():
+    _base_test_draw(TablebaseTree)
+
+
 def test_monte_carlo_draw_0_1s():
     _base_test_draw(MonteCarloTree, time_limit=0.1)
 
@@ -48,3 +115,27 @@ def test_monte_carlo_draw_0_5s():
 
 def test_monte_carlo_draw_1s():
     _base_test_draw(MonteCarloTree, time_limit=1)
+
+
+def test_monte_carlo_root_parallel_draw_0_5s():
+    _base_test_draw(MonteCarloTree, time_limit=0.5, workers=2)
+
+
+def test_monte_carlo_tree_parallel_draw_0_5s():
+    _base_test_draw(MonteCarloTree, time_limit=0.5, workers=2, parallel='tree')
+
+
+def test_monte_carlo_batch_draw_0_5s():
+    _base_test_draw(MonteCarloTree, time_limit=0.5, rollouts_per_leaf=10)
+
+
+def test_monte_carlo_iterations_draw():
+    _base_test_draw(MonteCarloTree, iterations=3000, seed=0)
+
+
+def test_monte_carlo_seed():
+    "test if the same seed builds the same tree"
+    trees = [MonteCarloTree(Node(), iterations=500, seed=1) for _ in range(2)]
+    for node in trees[0].root.children:
+        assert trees[0].get_simulation(node) == trees[1].get_simulation(node)
+    assert trees[0].count_simulations == trees[1].count_simulations == 500
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:52:06 2026
+
+Test cases for the search statistics of game trees
+
+"""
+from tic_tac_toe.node import Node
+from tic_tac_toe.tree.basic_game_tree import BasicGameTree
+from tic_tac_toe.tree.alpha_beta_pruning import AlphaBetaPruningTree
+from tic_tac_toe.tree.depth_first_alpha_beta import DepthFirstAlphaBetaTree
+from tic_tac_toe.tree.monte_carlo import MonteCarloTree
+from tic_tac_toe.tree.tablebase_tree import TablebaseTree
+
+
+DATA = [[1, 0, 0], [-1, 0, 0], [1, 0, -1]]
+
+
+def test_disabled_stats():
+    tree = BasicGameTree(Node(data=DATA))
+    assert tree.stats is None
+
+    # the methods are not wrapped
+    assert '_score' not in vars(tree)
+    assert '_expand_the_node' not in vars(tree)
+
+
+def test_minimax_stats():
+    tree = BasicGameTree(Node(data=DATA), stats=True)
+    n_nodes = sum(map(len, tree.layers))
+    assert tree.stats.nodes == n_nodes - 1
+    assert tree.stats.expands == n_nodes
+    assert tree.stats.winner_checks == sum(
+        node.terminated for layer in tree.layers for node in layer)
+    assert tree.stats.score_lookups == tree.stats.score_hits
+    assert tree.stats.times['expand'] > 0
+    assert tree.stats.times['score'] > 0
+
+
+def test_ab_pruning_stats():
+    tree = AlphaBetaPruningTree(Node(data=DATA), stats=True)
+    assert tree.stats.pruned > 0
+    assert tree.stats.times['backpropagate'] > 0
+    assert tree.transfer(tree.root).stats is not None
+
+
+def test_monte_carlo_stats():
+    tree = MonteCarloTree(Node(data=DATA), iterations=100, seed=0, stats=True)
+    assert tree.stats.detector_calls == 100
+    assert tree.stats.expands > 0
+
+
+def test_score_hits_without_scores():
+    # the scores are not stored in tree.scores
+    trees = [BasicGameTree(Node(data=DATA), storage='array', stats=True),
+             DepthFirstAlphaBetaTree(Node(data=DATA), stats=True),
+             TablebaseTree(Node(data=DATA), stats=True)]
+    for tree in trees:
+        hits = tree.stats.score_hits
+        tree.get_score(tree.root)
+        assert tree.stats.score_hits == hits + 1
+
+    # not reachable from the empty board
+    tree = trees[-1]
+    tree.get_score(Node(data=DATA, turn=-1))
+    assert tree.stats.score_lookups == tree.stats.score_hits + 1
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:20:48 2026
+
+Test cases for the retrograde solver and the tablebase files
+
+"""
+import pytest
+
+from tic_tac_toe.node import Node
+from tic_tac_toe.node_selector import NodeSelector
+from tic_tac_toe.play import initialize_game
+from tic_tac_toe.tablebase import UNKNOWN, load_tablebase, save_tablebase, solve
+from tic_tac_toe.tree.basic_game_tree import BasicGameTree
+from tic_tac_toe.tree.tablebase_tree import TablebaseTree
+
+
+def test_solve_3x3():
+    tablebase = solve(3, 3)
+
+    # the number of legal positions of tic-tac-toe
+    assert sum(sum(x.values()) for x in tablebase.distributions) == 5478
+    assert tablebase.get_score(Node()) == 0
+
+
+def test_same_scores_as_minimax():
+    tablebase = solve(3, 3)
+    root = Node(data=[[1, 0, 0], [0, -1, 0], [0, 0, 0]])
+    tree = BasicGameTree(root, transposition=True)
+    for layer in tree.layers:
+        for node in layer:
+            assert tablebase.get_score(node) == tree.get_score(node)
+
+
+def test_not_covered():
+    tablebase = solve(3, 3)
+
+    # the wrong player to move
+    assert tablebase.get_result(Node(turn=-1)) == UNKNOWN
+    assert tablebase.get_score(Node(turn=-1)) is None
+
+    # both players have a tic-tac-toe
+    data = [[1, 1, 1], [-1, -1, -1], [1, 0, 0]]
+    assert Node(data=data, turn=-1) not in tablebase
+
+    # the other board
+    assert Node(data=[[0] * 4 for _ in range(4)]) not in tablebase
+
+
+def test_save_and_load(tmp_path):
+    tablebase = solve(3, 3)
+    path = str(tmp_path / '3x3.ttt')
+    save_tablebase(tablebase, path)
+
+    loaded = load_tablebase(path)
+    assert (loaded.size, loaded.length) == (3, 3)
+    assert all(loaded.results[key] == tablebase.results[key]
+               for key in range(3 ** 9))
+
+
+def test_load_invalid_file(tmp_path):
+    path = tmp_path / 'invalid.ttt'
+    path.write_bytes(b'not a tablebase')
+    with pytest.raises(ValueError):
+        load_tablebase(str(path))
+
+
+def test_initialize_game_with_tablebase(tmp_path):
+    path = str(tmp_path / '3x3.ttt')
+    save_tablebase(solve(3, 3), path)
+
+    # the tree is not built for a covered board
+    root, selector = initialize_game(tree_type='minimax', tablebase=path)
+    assert isinstance(selector.tree, TablebaseTree)
+    assert selector.get_path(root)[-1].winner == 0
+
+    # the position MAX wins, selected by the tablebase only
+    root = Node(data=[[1, 0, 0], [-1, 0, 0], [1, 0, -1]])
+    selector = NodeSelector(None, tablebase=path)
+    assert selector.get_path(root)[-1].winner == 1
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:20:48 2026
+
+Test cases for the WinningDetector
+
+"""
+import random
+
+from tic_tac_toe.node import Node
+from tic_tac_toe.winning_detector import WinningDetector
+
+
+def test_detect_masks_one_step():
+    detector = WinningDetector(3, 3)
+
+    # MAX has two marks on the first row, MIN has the center
+    mask_1, mask_2 = 0b000000011, 0b000010000
+
+    # the threat only counts for the player to move
+    assert detector.detect_masks(mask_1, mask_2, 1) == [0, 1, 0]
+    assert detector.detect_masks(mask_1, mask_2, -1) == [0, 0, 0]
+
+
+def test_detect_masks_two_steps():
+    detector = WinningDetector(5, 3)
+    data = [[0] * 5 for _ in range(5)]
+    data[2][1] = data[2][2] = 1
+    data[0][0] = -1
+    node = Node(data, turn=-1, length=3)
+
+    # two lines of 3 in one step, and one open line of 4 in two steps
+    mask_1, mask_2 = node.masks
+    assert detector.detect_masks(mask_1, mask_2, 1) == [0, 3, 0]
+    assert detector.detect_masks(mask_1, mask_2, -1) == [0, 2, 0]
+    assert detector.detect(node) == [0, 2, 0]
+
+
+def _random_positions(size, length, count, seed=0):
+    "return random non-terminal nodes of the board"
+    rng = random.Random(seed)
+    nodes = []
+    while len(nodes) < count:
+        data = [[0] * size for _ in range(size)]
+        cells = [(row, col) for row in range(size) for col in range(size)]
+        rng.shuffle(cells)
+        n_marks = rng.randrange(size * size)
+        for ind, (row, col) in enumerate(cells[:n_marks]):
+            data[row][col] = 1 if ind % 2 == 0 else -1
+        node = Node(data, turn=1 if n_marks % 2 == 0 else -1, length=length)
+        if not node.terminated:
+            nodes.append(node)
+    return nodes
+
+
+def _get_state(counter):
+    return ([list(x) for x in counter._counts[1:]], counter.count_winning_path(),
+            {player: set(x) for player, x in counter.threats.items()},
+            counter.detect(1), counter.winner)
+
+
+def test_threat_counter_equals_detector():
+    for size, length in [(3, 3), (4, 3), (5, 4), (6, 4), (7, 5)]:
+        detector = WinningDetector(size, length)
+        for node in _random_positions(size, length, 30):
+            counter = detector.create_counter(node)
+            assert counter.winner == 0
+            assert counter.detect(node.turn) == detector.detect(node)
+            assert counter.count_winning_path() == detector.count_winning_path(node)
+
+
+def test_threat_counter_make_unmake():
+    for size, length in [(3, 3), (5, 4), (7, 5)]:
+        detector = WinningDetector(size, length)
+        for node in _random_positions(size, length, 10, seed=1):
+            counter = detector.create_counter(node)
+            before = _get_state(counter)
+            mask_1, mask_2 = node.masks
+            empty = [bit for bit in range(size * size)
+                     if not (mask_1 | mask_2) >> bit & 1]
+
+            # make every empty space, then undo them in the reverse order
+            for ind, bit in enumerate(empty):
+                counter.make(bit, node.turn if ind % 2 == 0 else -node.turn)
+            for ind, bit in reversed(list(enumerate(empty))):
+                counter.unmake(bit, node.turn if ind % 2 == 0 else -node.turn)
+            assert _get_state(counter) == before
+
+            # a single move is the same as detecting the child
+            if empty:
+                child_data = [list(row) for row in node.data]
+                child_data[empty[0] // size][empty[0] % size] = node.turn
+                child = Node(child_data, turn=-node.turn, length=length)
+                counter.make(empty[0], node.turn)
+                if not child.terminated:
+                    assert counter.detect(child.turn) == detector.detect(child)
+                assert counter.winner == child.winner
+                counter.unmake(empty[0], node.turn)
+                assert _get_state(counter) == before
+
+
+def test_detect_many():
+    for size, length in [(3, 3), (5, 4), (7, 5)]:
+        detector = WinningDetector(size, length)
+        positions = [node.masks + (node.turn,)
+                     for node in _random_positions(size, length, 30, seed=2)]
+        assert detector.detect_many(positions) == [
+            detector.detect_masks(*x) for x in positions]
+    assert detector.detect_many([]) == []
@@ -7,12 +7,25 @@ Created on Thu Nov 16 10:37:43 2023
 import sys
 import argparse
 from tic_tac_toe.play import play
+from tic_tac_toe.tablebase import MAX_CELLS
+
+
+# the trees scoring the nodes at the depth limit by the evaluation,
+# MonteCarloTree ignores the limit and DepthFirstAlphaBetaTree scores them as 0
+DEPTH_LIMITED_TREES = ('minimax', 'negamax', 'ab_pruning')
 
 
 def main():
     "Execute"
     args = init_args()
-    play(size=args.size, length=args.length, tree_type=args.tree)
+    kwargs = {}
+    if args.workers:
+        kwargs['workers'] = args.workers
+    if args.depth_limit:
+        kwargs['depth_limit'] = args.depth_limit
+    if args.tablebase:
+        kwargs['tablebase'] = args.tablebase
+    play(size=args.size, length=args.length, tree_type=args.tree, **kwargs)
 
 
 def init_args() -> argparse.Namespace:
@@ -26,4 +39,23 @@ def init_args() -> argparse.Namespace:
     parser.add_argument('-t', '--tree', required=False,
                         help='The type of game tree. The default is "ab_pruning"',
                         default="ab_pruning", type=str)
-    return parser.parse_args(sys.argv[1:])
+    parser.add_argument('-w', '--workers', required=False,
+                        help='The number of worker processes of "monte_carlo" tree.',
+                        default=None, type=int)
+    parser.add_argument('-d', '--depth-limit', required=False,
+                        help='The depth limit of "minimax", "negamax" or "ab_pruning" tree. '
+                        'The default is no limit.',
+                        default=None, type=int)
+    parser.add_argument('--tablebase', required=False,
+                        help='The path of a tablebase file, '
+                        'saved by "python -m tic_tac_toe.tablebase".',
+                        default=None, type=str)
+    args = parser.parse_args(sys.argv[1:])
+    if args.workers and args.tree != 'monte_carlo':
+        parser.error('--workers is only supported by the "monte_carlo" tree')
+    if args.depth_limit and args.tree not in DEPTH_LIMITED_TREES:
+        parser.error(f'--depth-limit is not supported by the "{args.tree}" tree')
+    if args.tree == 'retrograde' and args.size * args.size > MAX_CELLS:
+        parser.error(f'the board of size {args.size} is too large '
+                     'for the "retrograde" tree')
+    return args
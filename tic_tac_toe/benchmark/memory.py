@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:02:11 2026
+
+Memory benchmark of the game trees, in bytes per node
+
+Run the module to print the result of every type of game tree:
+
+    python -m tic_tac_toe.benchmark.memory --size 3 --length 3
+
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from tic_tac_toe.node import Node
+from tic_tac_toe.play import NAME_TO_TREE, _generate_empty_board
+
+
+# the trees keeping their nodes, the others search without Node children
+# and their bytes per node are meaningless
+NODE_TREES = ['minimax', 'negamax', 'ab_pruning', 'monte_carlo']
+
+
+def count_nodes(root):
+    "return the number of distinct nodes reachable from the root"
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.extend(node.children)
+    return len(seen)
+
+
+def measure_memory(tree_type, size=3, length=3, **kwargs):
+    """
+    build a tree from an empty board and measure its memory
+
+    params
+    ------
+    tree_type : "minimax", "negamax", "ab_pruning" or "monte_carlo",
+        The type of game tree.
+    size : int,
+        The size of the game board. The default is 3.
+    length : int,
+        The winning number of marks in a row. The default is 3.
+
+    kwargs
+    ------
+    Other keyword parameters for game tree.
+
+    returns
+    -------
+    result : dict,
+        The number of nodes, the traced bytes of the tree and
+        the bytes per node.
+
+    """
+    clazz = NAME_TO_TREE[tree_type]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        root = Node(_generate_empty_board(size), length=length)
+        tree = clazz(root, **kwargs)
+        n_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    n_nodes = count_nodes(tree.root)
+    return {'tree': tree_type,
+            'size': size,
+            'length': length,
+            'nodes': n_nodes,
+            'bytes': n_bytes,
+            'bytes_per_node': n_bytes / n_nodes}
+
+
+def main():
+    "Execute"
+    args = init_args()
+    width = max(len('tree'), *map(len, args.tree)) + 1
+    print(f"{'tree':<{width}} {'nodes':<10} {'bytes':<12} bytes/node")
+    for tree_type in args.tree:
+        kwargs = {}
+        if tree_type == 'monte_carlo':
+            kwargs['time_limit'] = args.time_limit
+        result = measure_memory(tree_type, args.size, args.length, **kwargs)
+        print(f"{tree_type:<{width}} {result['nodes']:<10d} {result['bytes']:<12d} "
+              f"{result['bytes_per_node']:.1f}")
+
+
+def init_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--size', required=False,
+                        help='Size of the game board. The default is 3.',
+                        default=3, type=int)
+    parser.add_argument('-l', '--length', required=False,
+                        help='The winning number of marks in a horizontal, vertical, or diagonal row',
+                        default=3, type=int)
+    parser.add_argument('-t', '--tree', required=False, nargs='+',
+                        help='The types of game tree. The default is all of them '
+                        'keeping their nodes.',
+                        default=NODE_TREES, choices=list(NAME_TO_TREE))
+    parser.add_argument('--time-limit', required=False,
+                        help='The time limit of Monte Carlo Tree. The default is 0.5.',
+                        default=0.5, type=float)
+    return parser.parse_args(sys.argv[1:])
+
+
+if __name__ == '__main__':
+    main()
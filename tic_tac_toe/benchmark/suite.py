@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:20:14 2026
+
+Speed benchmark of the game trees over a matrix of boards and start positions
+
+Run the module to print the results as JSON:
+
+    python -m tic_tac_toe.benchmark.suite --size 3 4 --length 3 --start empty center
+
+Store the results as a baseline, and compare later runs against it:
+
+    python -m tic_tac_toe.benchmark.suite --output baseline.json
+    python -m tic_tac_toe.benchmark.suite --compare baseline.json --threshold 0.2
+
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from itertools import product
+
+from tic_tac_toe.benchmark.memory import count_nodes
+from tic_tac_toe.node import Node
+from tic_tac_toe.play import NAME_TO_TREE, _generate_empty_board
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+DEFAULT_TREES = ('minimax', 'negamax', 'ab_pruning', 'monte_carlo')
+
+# the moves from the empty board, size - the list of (row, col)
+START_POSITIONS = {
+    'empty': lambda size: [],
+    'center': lambda size: [(size // 2, size // 2)],
+    'corner': lambda size: [(0, 0)],
+    'edge': lambda size: [(0, size // 2)],
+}
+
+# metrics compared with the baseline, True means higher is better
+METRICS = {
+    'nodes_per_second': True,
+    'simulations_per_second': True,
+    'build_time': False,
+    'peak_memory': False,
+}
+
+
+def create_start_position(size, length, start):
+    "return the node of the named start position"
+    node = Node(_generate_empty_board(size), length=length)
+    for index in START_POSITIONS[start](size):
+        node = node.expand_one(index)
+    return node
+
+
+def count_tree_nodes(tree):
+    "return the number of nodes created by the tree"
+    try:
+        # the depth-first tree searches bitmasks instead of nodes
+        return tree.count_searched
+    except AttributeError:
+        return count_nodes(tree.root)
+
+
+def get_peak_rss():
+    "return the peak resident set size of the process in bytes, None if unknown"
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(tree_type, size=3, length=3, start='empty', trace_memory=True,
+             **kwargs):
+    """
+    build a tree from a start position and measure it
+
+    params
+    ------
+    tree_type : str,
+        The key of the game tree in play.NAME_TO_TREE.
+    size : int,
+        The size of the game board. The default is 3.
+    length : int,
+        The winning number of marks in a row. The default is 3.
+    start : str,
+        The key of the start position in START_POSITIONS. The default is "empty".
+    trace_memory : bool,
+        Build the tree again with tracemalloc to measure the peak memory.
+        The build time is always measured without tracemalloc.
+
+    kwargs
+    ------
+    Other keyword parameters for game tree.
+
+    returns
+    -------
+    result : dict,
+        The case and its metrics, peak_memory is None if not traced.
+
+    """
+    clazz = NAME_TO_TREE[tree_type]
+    root = create_start_position(size, length, start)
+    gc.collect()
+    tree = clazz(root, **kwargs)
+    build_time = tree.building_time
+    n_nodes = count_tree_nodes(tree)
+    simulations = getattr(tree, 'count_simulations', None)
+    del tree
+
+    peak_memory = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            clazz(create_start_position(size, length, start), **kwargs)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    result = {'tree': tree_type,
+              'size': size,
+              'length': length,
+              'start': start,
+              'nodes': n_nodes,
+              'build_time': build_time,
+              'nodes_per_second': n_nodes / build_time if build_time else None,
+              'peak_memory': peak_memory,
+              'peak_rss': get_peak_rss()}
+    if simulations is not None:
+        result['simulations'] = simulations
+        result['simulations_per_second'] = (simulations / build_time
+                                            if build_time else None)
+    return result
+
+
+def run_suite(trees=DEFAULT_TREES, sizes=(3,), lengths=(3,), starts=('empty',),
+              trace_memory=True, tree_kwargs=None):
+    """
+    run every case of the matrix (tree, size, length, start)
+
+    params
+    ------
+    trees, sizes, lengths, starts : iterable,
+        The values of the matrix, lengths longer than the size are skipped.
+    trace_memory : bool,
+        Measure the peak memory by tracemalloc or not.
+    tree_kwargs : dict or None,
+        tree_type - keyword parameters of the game tree.
+
+    returns
+    -------
+    results : list of dict,
+        The results of run_case.
+
+    """
+    tree_kwargs = tree_kwargs or {}
+    results = []
+    for tree_type, size, length, start in product(trees, sizes, lengths, starts):
+        if length > size:
+            continue
+        results.append(run_case(tree_type, size, length, start, trace_memory,
+                                **tree_kwargs.get(tree_type, {})))
+    return results
+
+
+def _get_case_key(result):
+    return result['tree'], result['size'], result['length'], result['start']
+
+
+def compare_results(results, baseline, threshold=0.1):
+    """
+    compare the results with the baseline
+
+    params
+    ------
+    results, baseline : list of dict,
+        The results of run_suite, cases missing in either of them are skipped.
+    threshold : float,
+        The relative change of a metric counted as a regression.
+
+    returns
+    -------
+    regressions : list of dict,
+        The case, the metric, its baseline and current values, and the change.
+
+    """
+    baseline = {_get_case_key(x): x for x in baseline}
+    regressions = []
+    for result in results:
+        old = baseline.get(_get_case_key(result))
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (change < -threshold if higher_is_better else change > threshold):
+                regressions.append({'tree': result['tree'],
+                                    'size': result['size'],
+                                    'length': result['length'],
+                                    'start': result['start'],
+                                    'metric': metric,
+                                    'baseline': before,
+                                    'current': after,
+                                    'change': change})
+    return regressions
+
+
+def main():
+    "Execute"
+    args = init_args()
+    tree_kwargs = {'monte_carlo': {'iterations': args.iterations, 'seed': 0}}
+    if args.depth_limit:
+        for tree_type in ('minimax', 'negamax', 'ab_pruning', 'ab_depth_first'):
+            tree_kwargs[tree_type] = {'depth_limit': args.depth_limit}
+    results = run_suite(args.tree, args.size, args.length, args.start,
+                        not args.no_memory, tree_kwargs)
+    report = {'results': results}
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        report['regressions'] = compare_results(results, baseline, args.threshold)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    print(text)
+
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+def init_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--size', required=False, nargs='+',
+                        help='Sizes of the game board. The default is 3.',
+                        default=[3], type=int)
+    parser.add_argument('-l', '--length', required=False, nargs='+',
+                        help='The winning numbers of marks in a row. The default is 3.',
+                        default=[3], type=int)
+    parser.add_argument('--start', required=False, nargs='+',
+                        help='The start positions. The default is "empty".',
+                        default=['empty'], choices=list(START_POSITIONS))
+    parser.add_argument('-t', '--tree', required=False, nargs='+',
+                        help='The types of game tree. The default is '
+                        + ', '.join(DEFAULT_TREES) + '.',
+                        default=list(DEFAULT_TREES), choices=list(NAME_TO_TREE))
+    parser.add_argument('-d', '--depth-limit', required=False,
+                        help='The depth limit of the minimax trees. The default is no limit.',
+                        default=None, type=int)
+    parser.add_argument('--iterations', required=False,
+                        help='The iterations of Monte Carlo Tree. The default is 1000.',
+                        default=1000, type=int)
+    parser.add_argument('--no-memory', required=False, action='store_true',
+                        help='Do not build the trees again to trace the peak memory.')
+    parser.add_argument('-o', '--output', required=False,
+                        help='The JSON file to write the results, e.g. as a baseline.',
+                        default=None)
+    parser.add_argument('--compare', required=False,
+                        help='The JSON file of the baseline to compare with.',
+                        default=None)
+    parser.add_argument('--threshold', required=False,
+                        help='The relative change counted as a regression. '
+                        'The default is 0.1.',
+                        default=0.1, type=float)
+    return parser.parse_args(sys.argv[1:])
+
+
+if __name__ == '__main__':
+    main()
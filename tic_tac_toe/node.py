@@ -7,10 +7,10 @@ Created on Sun Oct  8 20:11:03 2023
 A basic component Node on the game tree
 
 """
-from copy import deepcopy
+from functools import lru_cache
+from tic_tac_toe.winning_lines import DIRECTIONS, get_winning_lines
 
 
-DIRECTIONS = [(0, 1), (1, 0), (1, 1), (-1, 1)]
 PLAYERS = {1: 'X', -1: 'O', 0: ' '}
 
 
@@ -18,6 +18,42 @@ def _number_to_string(turn):
     return PLAYERS[turn]
 
 
+def _iter_bits(mask):
+    "yield the index of every set bit of the mask, from the lowest one"
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def _count_bits(mask):
+    "return the number of set bits of the mask"
+    return bin(mask).count('1')
+
+
+@lru_cache(maxsize=None)
+def _get_symmetric_weights(size):
+    """
+    return the base-3 weights of every bit under the 8 symmetries of the board,
+    the weight of a bit is 3 ** (the bit it moves to)
+
+    """
+    last = size - 1
+    transforms = [lambda r, c: (r, c),
+                  lambda r, c: (c, last - r),
+                  lambda r, c: (last - r, last - c),
+                  lambda r, c: (last - c, r),
+                  lambda r, c: (r, last - c),
+                  lambda r, c: (last - r, c),
+                  lambda r, c: (c, r),
+                  lambda r, c: (last - c, last - r)]
+    weights = []
+    for transform in transforms:
+        moved = (transform(*divmod(bit, size)) for bit in range(size * size))
+        weights.append(tuple(3 ** (row * size + col) for row, col in moved))
+    return tuple(weights)
+
+
 def generate_tictactoe(coordinate, length):
     "return indices of tictactoe"
     ind_row, ind_col = coordinate
@@ -37,6 +73,12 @@ class Node:
     """
     node of the game tree
 
+    The board is stored as a pair of integer bitmasks, one for each player,
+    packed into one integer: the mask of -1 is shifted by size * size bits.
+    The cell (row, col) is the bit (row * size + col) of the masks.
+    The nested list "data", the dict "coordinates" and the rendered board
+    are computed from the masks only when they are accessed.
+
     params
     ------
     data : nested list or None,
@@ -52,35 +94,103 @@ class Node:
 
     attributes
     ----------
+    size : int,
+        the size of the game board
     terminated : bool,
         whether this node is a terminal state
     winner : 1, 0 or -1,
         the winner of this state, 0 means no winners
     children : list of Node,
-        child nodes of this node
+        child nodes of this node, a shared empty tuple if there are no children
     expanded : bool,
         whether this node is expanded
 
     """
 
+    __slots__ = ('size', 'turn', 'parent', 'depth', 'length', 'children',
+                 '_marks', '_key', '_n_empty', '_lines',
+                 '_coordinates', '_canonical_key',
+                 '__winner', '__terminated', '__expanded')
+
     def __init__(self, data=None, turn=1, parent=None, depth=0, length=3):
         self._set_data(data)
         self.turn = turn
         self.parent = parent
         self.depth = depth
         self.length = length
-        self.children = []
+        self.children = ()
         self.__expanded = False
+        self._lines = get_winning_lines(self.size, length)
 
-        self.__get_coordinates()
         self.__check_winner()
         self.__check_terminated()
-        self.__get_name()
 
     def _set_data(self, data):
         if data is None:
             data = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-        self.data = data
+        self.size = len(data)
+        masks = {1: 0, -1: 0}
+        for ind_row, row in enumerate(data):
+            for ind_col, element in enumerate(row):
+                if element:
+                    masks[element] |= 1 << (ind_row * self.size + ind_col)
+        self._marks = masks[1] | masks[-1] << self.size * self.size
+        self._key = sum(3 ** bit for bit in _iter_bits(masks[1])) + 2 * sum(
+            3 ** bit for bit in _iter_bits(masks[-1]))
+        self._coordinates = None
+        self._canonical_key = None
+        self._n_empty = _count_bits(self._get_empty_mask())
+
+    @property
+    def data(self):
+        "the current status of board, as a nested list"
+        size = self.size
+        return [[self._get_player(ind_row * size + ind_col)
+                 for ind_col in range(size)]
+                for ind_row in range(size)]
+
+    @property
+    def coordinates(self):
+        "player(1, 0 or -1) - a set of (row, col) taken by the player"
+        if self._coordinates is None:
+            coordinates = {}
+            for bit in range(self.size * self.size):
+                coordinates.setdefault(self._get_player(bit), set()).add(
+                    divmod(bit, self.size))
+            self._coordinates = coordinates
+        return self._coordinates
+
+    @property
+    def masks(self):
+        "the bitmasks of player 1 and player -1"
+        return self._get_mask(1), self._get_mask(-1)
+
+    @property
+    def key(self):
+        """
+        the base-3 encoding of the board, an empty space is 0,
+        a mark of 1 is 1 and a mark of -1 is 2 on the digit (row * size + col).
+
+        """
+        return self._key
+
+    @property
+    def canonical_key(self):
+        """
+        the minimum base-3 encoding of the board over its 8 symmetries
+        (rotations and reflections), an empty space is 0,
+        a mark of 1 is 1 and a mark of -1 is 2.
+        boards with the same canonical key have the same score.
+
+        """
+        if self._canonical_key is None:
+            marks_1 = list(_iter_bits(self._get_mask(1)))
+            marks_2 = list(_iter_bits(self._get_mask(-1)))
+            self._canonical_key = min(
+                sum(weights[x] for x in marks_1) +
+                2 * sum(weights[x] for x in marks_2)
+                for weights in _get_symmetric_weights(self.size))
+        return self._canonical_key
 
     @property
     def winner(self):
@@ -98,65 +208,67 @@ class Node:
         return self.__expanded
 
     def __repr__(self):
-        return self._name
+        return self.__get_name()
 
     def __hash__(self):
-        return hash(self._name)
+        return hash(self._key)
 
     def __eq__(self, oth):
-        return self._name == oth._name and self.turn == oth.turn
+        return (self._key == oth._key and self.turn == oth.turn
+                and self.size == oth.size)
 
     def __lt__(self, oth):
         return self.depth < oth.depth
 
-    def __get_name(self):
+    def _get_mask(self, player):
+        "return the bitmask of the given player"
+        n_cells = self.size * self.size
+        if player > 0:
+            return self._marks & ((1 << n_cells) - 1)
+        return self._marks >> n_cells
+
+    def _get_player(self, bit):
+        "return the player (1, 0 or -1) on the given bit"
+        if self._marks >> bit & 1:
+            return 1
+        if self._marks >> (bit + self.size * self.size) & 1:
+            return -1
+        return 0
+
+    def _get_empty_mask(self):
+        "return the bitmask of empty spaces"
+        return ((1 << self.size * self.size) - 1) & ~(self._get_mask(1) |
+                                                      self._get_mask(-1))
 
-        rows = [f'{i} ' + ' '.join(map(_number_to_string, r))
-                for i, r in enumerate(self.data)]
+    def __get_name(self):
+        "render the board as a string"
+        size = self.size
+        rows = [f'{i} ' + ' '.join(_number_to_string(self._get_player(i * size + j))
+                                   for j in range(size))
+                for i in range(size)]
         rows.append(
-            ' ' * 2 + ' '.join(map(str,
-                                   range(len(self.data[-1]))))
+            ' ' * 2 + ' '.join(map(str, range(size)))
         )
-        self._name = '\n'.join(rows) + '\n'
-
-    def __get_coordinates(self):
-        self.coordinates = {}
-        for ind_row, row in enumerate(self.data):
-            for ind_col, element in enumerate(row):
-                self.coordinates[element] = (
-                    self.coordinates.get(element, set()) |
-                    {(ind_row, ind_col)})
+        return '\n'.join(rows) + '\n'
 
     def __check_winner(self):
         "check if there is a winner"
         self.__winner = 0
-        for player, coordinates in self.coordinates.items():
-            if player == 0:
+        for player in (1, -1):
+            mask = self._get_mask(player)
+            if _count_bits(mask) < self.length:
                 continue
-            if len(coordinates) < self.length:
-                continue
-            for coordinate in coordinates:
-                for ind_tictactoe in generate_tictactoe(coordinate, self.length):
-                    if len(ind_tictactoe & coordinates) == self.length:
-                        self.__winner = player
-                        return
+            if self._lines.check_winner(mask):
+                self.__winner = player
+                return
 
     def __check_terminated(self):
-        self.__terminated = True
-
-        # tic-tac-toe!
-        if self.winner:
-            return
-
-        # board not fulled
-        for row in self.data:
-            if 0 in row:
-                self.__terminated = False
-                return
+        # tic-tac-toe! or board fulled
+        self.__terminated = bool(self.winner) or not self._n_empty
 
     def clear_children(self):
         "remove all the child nodes"
-        self.children.clear()
+        self.children = ()
         self.__expanded = False
 
     def expand(self):
@@ -169,32 +281,68 @@ class Node:
 
         # dont expand the terminal state
         if self.terminated:
-            self.children = []
             return self.children
 
         # expanding
-        children = []
-        for index in self.coordinates.get(0, set()):
-            node = self.expand_one(index)
-            children.append(node)
-        self.children = children
+        self.children = [self._expand_bit(bit)
+                         for bit in _iter_bits(self._get_empty_mask())]
         return self.children
 
+    def unique_children(self):
+        "expand and return child nodes, skipping the symmetric duplicates"
+        children = {}
+        for child in self.expand():
+            children.setdefault(child.canonical_key, child)
+        return list(children.values())
+
     def expand_one(self, index):
         "expand one child node by the given index"
         ind_row, ind_col = index
 
         # check index
-        if self.data[ind_row][ind_col] != 0:
+        if not (0 <= ind_row < self.size and 0 <= ind_col < self.size):
+            raise IndexError("The given index is out of the board!")
+        bit = ind_row * self.size + ind_col
+        if self._get_player(bit) != 0:
             raise ExpandingError("The space of given index is not empty!")
 
-        # update data
-        data = deepcopy(self.data)
-        data[ind_row][ind_col] = self.turn
-        child = type(self)(data, -self.turn,
-                           parent=self,
-                           depth=self.depth + 1,
-                           length=self.length)
+        return self._expand_bit(bit)
+
+    def _expand_bit(self, bit):
+        """
+        expand one child node by placing a mark on the given empty bit.
+        the state of the child is derived from this node and the move,
+        only the lines passing through the new mark are checked.
+
+        """
+        child = type(self).__new__(type(self))
+        if self.turn > 0:
+            child._marks = self._marks | 1 << bit
+            child._key = self._key + 3 ** bit
+        else:
+            child._marks = self._marks | 1 << (bit + self.size * self.size)
+            child._key = self._key + 2 * 3 ** bit
+        child._coordinates = None
+        child._canonical_key = None
+        child._n_empty = self._n_empty - 1
+        child.size = self.size
+        child.turn = -self.turn
+        child.parent = self
+        child.depth = self.depth + 1
+        child.length = self.length
+        child._lines = self._lines
+        child.children = ()
+        child.__expanded = False
+
+        # only the new mark can make a tic-tac-toe
+        child.__winner = self.winner
+        if not child.__winner:
+            mask = child._get_mask(self.turn)
+            for line in self._lines.masks_through[bit]:
+                if mask & line == line:
+                    child.__winner = self.turn
+                    break
+        child.__check_terminated()
         return child
 
 
@@ -10,6 +10,8 @@ The NodeSelector class
 from math import isinf
 from random import choice
 
+from tic_tac_toe.tablebase import load_tablebase
+
 
 class NodeSelector:
     """
@@ -20,6 +22,10 @@ class NodeSelector:
     ------
     tree : GameTree,
         A game tree, having a "get_score" method that returns the score of a given node.
+    tablebase : Tablebase, str or None,
+        A tablebase or the path of a tablebase file. The positions covered
+        by the tablebase are selected by it, without the tree.
+        The default is None.
 
     kwargs
     ------
@@ -27,8 +33,11 @@ class NodeSelector:
 
     """
 
-    def __init__(self, tree):
+    def __init__(self, tree, tablebase=None):
         self.tree = tree
+        if isinstance(tablebase, str):
+            tablebase = load_tablebase(tablebase)
+        self.tablebase = tablebase
 
     @staticmethod
     def print_path(path):
@@ -74,10 +83,14 @@ class NodeSelector:
             None means the current node is a terminal state.
 
         """
-        # build a new tree from the given node if the node is not on the tree
-        if ((self.tree.renew and self.tree.root != node)
-                or isinf(self.tree.get_score(node))):
-            self.tree = self.tree.transfer(root=node)
+        if self.tablebase is not None and node in self.tablebase:
+            get_score = self.tablebase.get_score
+        else:
+            # build a new tree from the given node if the node is not on the tree
+            if ((self.tree.renew and self.tree.root != node)
+                    or isinf(self.tree.get_score(node))):
+                self.tree = self.tree.transfer(root=node)
+            get_score = self.tree.get_score
 
         # get child nodes
         children = node.expand()
@@ -85,7 +98,7 @@ class NodeSelector:
             return None
 
         # select the best score
-        scores = [self.tree.get_score(x) * node.turn for x in children]
+        scores = [get_score(x) * node.turn for x in children]
         score = max(scores)
         children = [c for c, s in zip(children, scores) if s == score]
 
@@ -6,10 +6,13 @@ Created on Tue Nov 14 15:43:27 2023
 """
 
 from tic_tac_toe.node import Node
+from tic_tac_toe.tablebase import load_tablebase
 from tic_tac_toe.tree.basic_game_tree import BasicGameTree
 from tic_tac_toe.tree.negamax_tree import NegamaxGameTree
 from tic_tac_toe.tree.alpha_beta_pruning import AlphaBetaPruningTree
+from tic_tac_toe.tree.depth_first_alpha_beta import DepthFirstAlphaBetaTree
 from tic_tac_toe.tree.monte_carlo import MonteCarloTree
+from tic_tac_toe.tree.tablebase_tree import TablebaseTree
 
 from tic_tac_toe.node_selector import NodeSelector
 
@@ -18,7 +21,9 @@ NAME_TO_TREE = {
     "minimax": BasicGameTree,
     "negamax": NegamaxGameTree,
     "ab_pruning": AlphaBetaPruningTree,
+    "ab_depth_first": DepthFirstAlphaBetaTree,
     'monte_carlo': MonteCarloTree,
+    'retrograde': TablebaseTree,
 }
 
 
@@ -30,8 +35,12 @@ def play(**kwargs):
     ------
     size : int,
         The size of the game board. The default is 3.
-    tree_type : "minimax", "negamax", "ab_pruning" or "monte_carlo"
+    tree_type : "minimax", "negamax", "ab_pruning", "ab_depth_first",
+                "monte_carlo" or "retrograde"
         The type of game tree.
+    tablebase : str or None,
+        The path of a tablebase file. If it covers the board,
+        the game tree is not built. The default is None.
 
     kwargs
     ------
@@ -76,12 +85,19 @@ def play(**kwargs):
         play_again = input("Play again ([Y]/N)? ").upper().strip() != 'N'
 
 
-def initialize_game(size=3, length=3, tree_type="ab_pruning", **kwargs):
+def initialize_game(size=3, length=3, tree_type="ab_pruning", tablebase=None,
+                    **kwargs):
     "Initialize the game components"
     root = Node(_generate_empty_board(size), length=length)
-    clazz = NAME_TO_TREE[tree_type]
-    game_tree = clazz(root, **kwargs)
-    node_selector = NodeSelector(game_tree)
+    if tablebase is not None:
+        tablebase = load_tablebase(tablebase)
+    if tablebase is not None and root in tablebase:
+        # skip building the tree
+        game_tree = TablebaseTree(root, tablebase=tablebase)
+    else:
+        clazz = NAME_TO_TREE[tree_type]
+        game_tree = clazz(root, **kwargs)
+    node_selector = NodeSelector(game_tree, tablebase=tablebase)
     return game_tree.root, node_selector
 
 
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:05:21 2026
+
+The retrograde solver and the Tablebase class
+
+Every position reachable from the empty board is listed layer by layer,
+by the number of marks, and stored at its base-3 key (Node.key).
+The terminal positions are labeled while listing, then the results of
+the other positions are propagated backwards from the last layer.
+
+A solved tablebase can be saved into a binary file, and opened by mmap,
+so it is solved only once and shared by processes. Run the module to solve
+a board and save it:
+
+    python -m tic_tac_toe.tablebase --size 3 --length 3 --output 3x3.ttt
+
+"""
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from tic_tac_toe.winning_lines import get_winning_lines
+
+
+# the packed results of positions
+UNKNOWN = 0  # not reachable from the empty board
+DRAW = 1
+MAX_WIN = 2
+MIN_WIN = 3
+_PENDING = 4  # reachable and non-terminal, not solved yet
+
+RESULT_TO_SCORE = {DRAW: 0, MAX_WIN: 1, MIN_WIN: -1}
+
+# the largest number of cells to solve, 3 ** 16 results take 43 MB
+MAX_CELLS = 16
+
+# the header of a tablebase file: magic, version, size and length
+_HEADER = struct.Struct('<4sBBBx')
+_MAGIC = b'TTTB'
+_VERSION = 1
+
+
+class PackedResults:
+    """
+    The results packed into 2 bits per position, read from a buffer
+    without copying it
+
+    params
+    ------
+    buffer : bytes-like,
+        the packed results, the result of the key k is the bits
+        (2 * (k % 4), 2 * (k % 4) + 1) of the byte offset + k // 4
+    offset : int,
+        the offset of the first byte in the buffer
+    length : int,
+        the number of results
+
+    """
+
+    __slots__ = ('buffer', 'offset', 'length')
+
+    def __init__(self, buffer, offset, length):
+        self.buffer = buffer
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, key):
+        if not 0 <= key < self.length:
+            raise IndexError(key)
+        return self.buffer[self.offset + (key >> 2)] >> ((key & 3) << 1) & 3
+
+
+def _pack(results):
+    "return the results packed into 2 bits per position"
+    results = bytes(results) + bytes(-len(results) % 4)
+    packed = 0
+    for ind in range(4):
+        # a result shifted in its byte never overflows to the next byte
+        packed |= int.from_bytes(results[ind::4], 'little') << (2 * ind)
+    return packed.to_bytes(len(results) // 4, 'little')
+
+
+class Tablebase:
+    """
+    The results of every position reachable from the empty board,
+    indexed by the base-3 key of the board.
+
+    params
+    ------
+    size : int,
+        the size of the game board
+    length : int,
+        the winning number of marks in a row
+    results : bytearray or PackedResults,
+        the result (UNKNOWN, DRAW, MAX_WIN or MIN_WIN)
+        of every key from 0 to 3 ** (size * size) - 1
+
+    attributes
+    ----------
+    distributions : list of dict,
+        score(-1, 0 or 1) - the number of positions with the score,
+        for every number of marks. Only known for a solved tablebase.
+
+    """
+
+    def __init__(self, size, length, results):
+        if len(results) != 3 ** (size * size):
+            raise ValueError(f"expected {3 ** (size * size)} results, "
+                             f"got {len(results)}")
+        self.size = size
+        self.length = length
+        self.results = results
+        self.distributions = []
+
+    def __repr__(self):
+        return (f'{type(self).__name__}(size={self.size}, length={self.length})')
+
+    def __contains__(self, node):
+        return self.get_result(node) != UNKNOWN
+
+    def get_result(self, node):
+        "return the packed result of the node, UNKNOWN if not covered"
+        if node.size != self.size or node.length != self.length:
+            return UNKNOWN
+        mask_1, mask_2 = node.masks
+        # MAX moves first
+        n_marks = bin(mask_1 | mask_2).count('1')
+        if node.turn != (1 if n_marks % 2 == 0 else -1):
+            return UNKNOWN
+        return self.results[node.key]
+
+    def get_score(self, node):
+        "return the score of the node, None if not covered"
+        return RESULT_TO_SCORE.get(self.get_result(node))
+
+
+def solve(size=3, length=3):
+    """
+    solve every position reachable from the empty board by retrograde analysis
+
+    params
+    ------
+    size : int,
+        the size of the game board. The default is 3.
+    length : int,
+        the winning number of marks in a row. The default is 3.
+
+    returns
+    -------
+    tablebase : Tablebase,
+        the results of the positions
+
+    """
+    n_cells = size * size
+    if n_cells > MAX_CELLS:
+        raise ValueError(f"the board of size {size} is too large to solve")
+    results = bytearray(3 ** n_cells)
+    distributions = [{0: 0, 1: 0, -1: 0} for _ in range(n_cells + 1)]
+    layers = _list_positions(size, length, results, distributions)
+
+    # propagate the results backwards, from the last layer
+    powers = [3 ** bit for bit in range(n_cells)]
+    full = (1 << n_cells) - 1
+    for n_marks in range(len(layers) - 1, -1, -1):
+        turn = 1 if n_marks % 2 == 0 else -1
+        digit = 1 if turn > 0 else 2
+        win, lose = (MAX_WIN, MIN_WIN) if turn > 0 else (MIN_WIN, MAX_WIN)
+        keys, marks = layers[n_marks]
+        for key, mark in zip(keys, marks):
+            empty = full & ~(mark | mark >> n_cells)
+            result = lose
+            while empty:
+                lowest = empty & -empty
+                empty ^= lowest
+                child = results[key + digit * powers[lowest.bit_length() - 1]]
+                if child == win:
+                    result = win
+                    break
+                if child == DRAW:
+                    result = DRAW
+            results[key] = result
+            distributions[n_marks][RESULT_TO_SCORE[result]] += 1
+
+    tablebase = Tablebase(size, length, results)
+    tablebase.distributions = [x for x in distributions if any(x.values())]
+    return tablebase
+
+
+def _list_positions(size, length, results, distributions):
+    """
+    list the non-terminal positions reachable from the empty board
+    by the number of marks, label the terminal positions in results,
+    and count them in distributions
+
+    returns
+    -------
+    layers : list of (array, array),
+        the keys and the marks (mask_1 | mask_2 << n_cells) of every position
+
+    """
+    n_cells = size * size
+    full = (1 << n_cells) - 1
+    masks_through = get_winning_lines(size, length).masks_through
+    powers = [3 ** bit for bit in range(n_cells)]
+    key_type = 'L' if 3 ** n_cells <= 1 << 32 else 'Q'
+
+    results[0] = _PENDING
+    layers = [(array(key_type, [0]), array('Q', [0]))]
+    for n_marks in range(n_cells):
+        turn = 1 if n_marks % 2 == 0 else -1
+        digit, shift = (1, 0) if turn > 0 else (2, n_cells)
+        win = MAX_WIN if turn > 0 else MIN_WIN
+        next_keys = array(key_type)
+        next_marks = array('Q')
+        for key, mark in zip(*layers[-1]):
+            own = mark >> shift & full
+            empty = full & ~(mark | mark >> n_cells)
+            while empty:
+                lowest = empty & -empty
+                empty ^= lowest
+                bit = lowest.bit_length() - 1
+                child = key + digit * powers[bit]
+                if results[child]:
+                    continue
+
+                # only the new mark can make a tic-tac-toe
+                child_own = own | lowest
+                if any(child_own & line == line for line in masks_through[bit]):
+                    results[child] = win
+                    distributions[n_marks + 1][turn] += 1
+                elif n_marks + 1 == n_cells:
+                    results[child] = DRAW
+                    distributions[n_marks + 1][0] += 1
+                else:
+                    results[child] = _PENDING
+                    next_keys.append(child)
+                    next_marks.append(mark | lowest << shift)
+        if not next_keys:
+            break
+        layers.append((next_keys, next_marks))
+    return layers
+
+
+@lru_cache(maxsize=None)
+def get_tablebase(size, length):
+    "return the shared solved Tablebase of the given size and length"
+    return solve(size, length)
+
+
+def save_tablebase(tablebase, path):
+    """
+    save the tablebase into a binary file,
+    a header followed by the results packed into 2 bits per position
+
+    params
+    ------
+    tablebase : Tablebase,
+        the tablebase to save
+    path : str,
+        the path of the file
+
+    """
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, tablebase.size, tablebase.length))
+        file.write(_pack(tablebase.results))
+
+
+def load_tablebase(path):
+    """
+    open a tablebase file by mmap, the results are read from the shared pages
+    of the file without loading them
+
+    params
+    ------
+    path : str,
+        the path of the file saved by save_tablebase
+
+    returns
+    -------
+    tablebase : Tablebase,
+        the tablebase of the file
+
+    """
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, version, size, length = _HEADER.unpack_from(buffer)
+    except struct.error:
+        magic = version = None
+    if magic != _MAGIC or version != _VERSION:
+        buffer.close()
+        raise ValueError(f"{path} is not a tablebase file")
+    n_results = 3 ** (size * size)
+    if len(buffer) != _HEADER.size + (n_results + 3) // 4:
+        buffer.close()
+        raise ValueError(f"{path} is truncated")
+    return Tablebase(size, length, PackedResults(buffer, _HEADER.size, n_results))
+
+
+def main():
+    "Execute"
+    args = init_args()
+    tablebase = solve(args.size, args.length)
+    save_tablebase(tablebase, args.output)
+    print(f"saved {sum(sum(x.values()) for x in tablebase.distributions)} "
+          f"positions to {args.output}")
+
+
+def init_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--size', required=False,
+                        help='Size of the game board. The default is 3.',
+                        default=3, type=int)
+    parser.add_argument('-l', '--length', required=False,
+                        help='The winning number of marks in a horizontal, vertical, or diagonal row',
+                        default=3, type=int)
+    parser.add_argument('-o', '--output', required=True,
+                        help='The path of the tablebase file.', type=str)
+    return parser.parse_args(sys.argv[1:])
+
+
+if __name__ == '__main__':
+    main()
@@ -26,6 +26,13 @@ class AlphaBetaPruningTree(BasicGameTree):
         The root of the tree. None means starting from an empty board.
     depth_limit : int or None,
         The depth limit of the tree. None means no depth limit.
+    evaluate : callable,
+        evaluate(node) returns the estimated score (float) between -1 and 1
+        of a non-terminal node at the depth limit.
+        The default is evaluate_node.
+    stats : bool,
+        Count and time the search in a SearchStats, shown by show().
+        The default is False.
 
     Attributes
     ----------
@@ -35,11 +42,17 @@ class AlphaBetaPruningTree(BasicGameTree):
         node(Node) - [minimum_score(-inf, -1, 0, or 1),
                       maximum_score(-1, 0, or 1, or inf)]
         A dictionary to match nodes to their score range.
+        The keys are (canonical_key, turn) in the symmetry mode.
     building_time : float,
         The building time of the tree, in seconds.
 
     """
 
+    # score ranges are updated through node.parent only
+    _support_transposition = False
+
+    _supported_storages = ('nodes',)
+
     def _expand_next(self):
         "Expand the next node"
         node = self._frontiers.get()
@@ -64,11 +77,12 @@ class AlphaBetaPruningTree(BasicGameTree):
             True means to expand, False means to stop.
 
         """
-        if node.terminated:
+        # nodes at the depth limit are recorded without expanding
+        if node.terminated or self._at_horizon(node):
             return True
 
         # Root node must be expanded
-        if not node.parent:
+        if node is self.root:
             return True
 
         # Do not expand if the root has converged score
@@ -79,9 +93,9 @@ class AlphaBetaPruningTree(BasicGameTree):
         # Check parent's parent
         previous_node = node.parent
         beta_previous, alpha_previous = self.get_score_range(previous_node)
-        old_node = previous_node.parent
-        if not old_node:
+        if previous_node is self.root:
             return True
+        old_node = previous_node.parent
 
         # Pruning
         beta_old, alpha_old = self.get_score_range(old_node)
@@ -92,11 +106,23 @@ class AlphaBetaPruningTree(BasicGameTree):
         # MIN player
         return beta_previous <= alpha_old
 
+    def _skip_symmetric_children(self, children):
+        """
+        return children without symmetric duplicates among siblings.
+        the score ranges are updated through node.parent,
+        so the symmetric nodes under other parents are still expanded.
+
+        """
+        unique_children = {}
+        for child in children:
+            unique_children.setdefault(self._get_key(child), child)
+        return list(unique_children.values())
+
     def _backpropagate(self, node):
         "Update the scores of nodes on the whole branch"
         node = node.parent
 
-        # stop untill reach the root
+        # stop untill reach the root, which can have a parent out of the tree
         while node:
             score_range = self.get_score_range(node)
             child_scores = [self.get_score_range(c) for c in node.children]
@@ -131,23 +157,27 @@ class AlphaBetaPruningTree(BasicGameTree):
                     pass
 
             # update the next parent
+            if node is self.root:
+                break
             node = node.parent
 
     def _score(self, node):
         """
         Compute score for the node.
         And update scores for every nodes on the branch
-        when reach a terminal state.
+        when reach a terminal state or the depth limit.
 
         """
-        if node.terminated:
-            self.scores[node] = [node.winner, node.winner]
+        key = self._get_key(node)
+        if node.terminated or self._at_horizon(node):
+            score = node.winner if node.terminated else self.evaluate(node)
+            self.scores[key] = [score, score]
             self._backpropagate(node)
-            return self.scores[node]
+            return self.scores[key]
 
         # middle nodes
-        self.scores[node] = self.get_score_range(node)
-        return self.scores[node]
+        self.scores[key] = self.get_score_range(node)
+        return self.scores[key]
 
     def get_score_range(self, node):
         """
@@ -155,7 +185,7 @@ class AlphaBetaPruningTree(BasicGameTree):
         It will be [-inf, inf] if the node is not scored.
         """
         try:
-            score_range = self.scores[node]
+            score_range = self.scores[self._get_key(node)]
         except KeyError:
             # default score range
             score_range = [-inf, inf]
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:40:05 2026
+
+The ArrayTreeStorage class
+
+"""
+from array import array
+from bisect import bisect_left
+
+from tic_tac_toe.winning_lines import get_winning_lines
+
+
+UNSCORED = 127  # the score of nodes that are not scored
+
+
+class ArrayTreeStorage:
+    """
+    A game tree stored in flat arrays instead of Node objects.
+    Nodes are built breadth first from the root, one layer per depth.
+    The same position in a layer is stored only once, so the tree is a DAG.
+    Nodes in a layer are sorted by their keys to search them by bisection.
+    The children of the i-th node are
+    children[child_offsets[i]:child_offsets[i] + child_counts[i]].
+
+    params
+    ------
+    root : Node,
+        The root of the tree.
+    depth_limit : int or None,
+        The depth limit of the tree. None means no depth limit.
+    backup : callable,
+        backup(turn, child_scores) returns the score of a node
+        from the scores of its children.
+
+    attributes
+    ----------
+    keys : array or list,
+        The base-3 key (Node.key) of every node.
+    parents : array,
+        The index of the first parent of every node, -1 for the root.
+    child_offsets : array,
+        The offset of the first child of every node in children.
+    child_counts : array,
+        The number of children of every node.
+    children : array,
+        The indices of child nodes.
+    scores : array,
+        The score (-1, 0 or 1) of every node, UNSCORED for nodes at the depth limit.
+    layer_offsets : list of int,
+        The index of the first node of every layer, ending with the number of nodes.
+
+    """
+
+    def __init__(self, root, depth_limit=None, backup=max):
+        self.root_depth = root.depth
+        self.root_turn = root.turn
+        self.size = root.size
+        self.depth_limit = depth_limit
+        self._backup = backup
+        self._n_cells = root.size * root.size
+        self._lines = get_winning_lines(root.size, root.length)
+
+        if 3 ** self._n_cells <= 1 << 64:
+            self.keys = array('Q')
+        else:
+            self.keys = []
+        self.parents = array('l')
+        self.child_offsets = array('l')
+        self.child_counts = array('h')
+        self.children = array('l')
+        self.scores = array('b')
+        self.layer_offsets = [0]
+
+        self._build(root)
+        self._score_all()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _build(self, root):
+        "build the tree layer by layer"
+        mask_1, mask_2 = root.masks
+        layer = [(root.key, mask_1 | mask_2 << self._n_cells)]
+        self._append_layer(layer, [-1], [root.winner if root.terminated else UNSCORED])
+
+        depth = 0
+        turn = root.turn
+        while layer:
+            if self.depth_limit and depth >= self.depth_limit:
+                break
+            layer = self._expand_layer(layer, turn)
+            depth += 1
+            turn = -turn
+
+        # the last layer has no children
+        for _ in range(len(self.keys) - len(self.child_offsets)):
+            self.child_offsets.append(len(self.children))
+            self.child_counts.append(0)
+
+    def _expand_layer(self, layer, turn):
+        """
+        expand all the non-terminal nodes in the layer,
+        return the next layer as a list of (key, marks)
+
+        """
+        n_cells = self._n_cells
+        full = (1 << n_cells) - 1
+        shift = 0 if turn > 0 else n_cells
+        digit = 1 if turn > 0 else 2
+        start = self.layer_offsets[-2]
+
+        next_indices = {}  # key - index in the next layer
+        next_layer = []
+        next_parents = []
+        next_scores = []
+        edges = []
+        for ind, (key, marks) in enumerate(layer):
+            self.child_offsets.append(len(self.children) + len(edges))
+            if self.scores[start + ind] != UNSCORED:
+                # terminal state
+                self.child_counts.append(0)
+                continue
+
+            empty = full & ~(marks | marks >> n_cells)
+            last_move = not empty & (empty - 1)
+            count = 0
+            while empty:
+                lowest = empty & -empty
+                empty ^= lowest
+                bit = lowest.bit_length() - 1
+                child_key = key + digit * 3 ** bit
+                count += 1
+
+                child_ind = next_indices.get(child_key)
+                if child_ind is None:
+                    child_marks = marks | lowest << shift
+                    child_ind = len(next_layer)
+                    next_indices[child_key] = child_ind
+                    next_layer.append((child_key, child_marks))
+                    next_parents.append(start + ind)
+                    next_scores.append(self._check_terminal(
+                        child_marks >> shift & full, bit, turn, last_move))
+                edges.append(child_ind)
+            self.child_counts.append(count)
+
+        # sort the next layer by keys, and redirect edges to the sorted indices
+        order = sorted(range(len(next_layer)), key=lambda x: next_layer[x][0])
+        new_indices = [0] * len(order)
+        offset = self.layer_offsets[-1]
+        for new_ind, old_ind in enumerate(order):
+            new_indices[old_ind] = offset + new_ind
+        self.children.extend(new_indices[x] for x in edges)
+
+        next_layer = [next_layer[x] for x in order]
+        if not next_layer:
+            return next_layer
+        self._append_layer(next_layer,
+                           [next_parents[x] for x in order],
+                           [next_scores[x] for x in order])
+        return next_layer
+
+    def _check_terminal(self, mask, bit, turn, last_move):
+        """
+        return the winner if the new mark on the bit ends the game,
+        otherwise return UNSCORED
+
+        """
+        for line in self._lines.masks_through[bit]:
+            if mask & line == line:
+                return turn
+        if last_move:
+            return 0
+        return UNSCORED
+
+    def _append_layer(self, layer, parents, scores):
+        self.keys.extend(key for key, _ in layer)
+        self.parents.extend(parents)
+        self.scores.extend(scores)
+        self.layer_offsets.append(len(self.keys))
+
+    def _score_all(self):
+        "score all nodes from the bottom, layer by layer"
+        scores = self.scores
+        children = self.children
+        for depth in range(len(self.layer_offsets) - 2, -1, -1):
+            turn = self.root_turn if depth % 2 == 0 else -self.root_turn
+            for ind in range(self.layer_offsets[depth], self.layer_offsets[depth + 1]):
+                count = self.child_counts[ind]
+                if not count:
+                    continue
+                offset = self.child_offsets[ind]
+                child_scores = [scores[x] for x in children[offset:offset + count]
+                                if scores[x] != UNSCORED]
+                if child_scores:
+                    scores[ind] = self._backup(turn, child_scores)
+
+    def find(self, node):
+        "return the index of the node, or -1 if the node is not in the tree"
+        depth = node.depth - self.root_depth
+        if not 0 <= depth < len(self.layer_offsets) - 1 or node.size != self.size:
+            return -1
+        turn = self.root_turn if depth % 2 == 0 else -self.root_turn
+        if node.turn != turn:
+            return -1
+        low, high = self.layer_offsets[depth], self.layer_offsets[depth + 1]
+        ind = bisect_left(self.keys, node.key, low, high)
+        if ind < high and self.keys[ind] == node.key:
+            return ind
+        return -1
+
+    def get_layer_scores(self, depth):
+        "return scores of nodes in the layer"
+        return self.scores[self.layer_offsets[depth]:self.layer_offsets[depth + 1]]
@@ -8,10 +8,22 @@ The Basic Game Tree Class
 
 """
 import time
-from math import inf
+from math import inf, isinf
 from queue import LifoQueue
 
 from tic_tac_toe.node import Node
+from tic_tac_toe.tree.array_storage import UNSCORED, ArrayTreeStorage
+from tic_tac_toe.tree.search_stats import SearchStats
+from tic_tac_toe.winning_detector import evaluate_node
+
+
+def _add_to_distribution(distribution, score):
+    "count the score in the score distribution"
+    if isinstance(score, float) and not isinf(score):
+        # the estimated score from the depth limit, not a proven result
+        score = 'estimated'
+        distribution.setdefault(score, 0)
+    distribution[score] += 1
 
 
 class BasicGameTree:
@@ -27,8 +39,32 @@ class BasicGameTree:
     root : Node or None,
         The given root of the tree. None means to start from an empty board.
     depth_limit : int or None,
-        The depth limit of the tree, should only use on Monte Carlo Tree.
-        None means no depth limit.
+        The depth limit of the tree. Non-terminal nodes at the depth limit
+        are not expanded but scored by evaluate. None means no depth limit.
+    transposition : bool,
+        Merge nodes of the same position reached by different move orders,
+        which turns the tree into a DAG. Every position is expanded and
+        scored only once. The default is False.
+    symmetry : bool,
+        Score nodes by their canonical keys, so rotated and mirrored positions
+        share one score. Only one node of the symmetric positions is expanded.
+        The default is False.
+    storage : "nodes", "array" or "stream",
+        "nodes" stores the tree as Node objects in layers.
+        "array" stores the tree in flat arrays (ArrayTreeStorage) without
+        Node objects, merging the same positions in a layer, and scores it
+        layer by layer.
+        "stream" scores nodes depth first in post-order, and drops the
+        children of a node once it is scored. Only the scores of the root
+        and its children are kept, with the size and the score distribution
+        of every layer, so the memory is O(depth * branching).
+        The default is "nodes".
+    evaluate : callable,
+        evaluate(node) returns the estimated score (float) between -1 and 1
+        of a non-terminal node at the depth limit. The default is evaluate_node.
+    stats : bool,
+        Count and time the search in a SearchStats, shown by show().
+        The default is False, which costs nothing.
 
     attributes
     ----------
@@ -37,10 +73,14 @@ class BasicGameTree:
     scores : dict,
         node(Node) - score(-1, 0 or 1)
         A dictionary to match nodes to scores.
+        The keys are (canonical_key, turn) in the symmetry mode.
     building_time : float,
         The building time of the tree, in seconds.
     renew : bool,
-        Requiring renew after selecting the next node or not.
+        Requiring renew after selecting the next node or not,
+        True if there is a depth limit.
+    stats : SearchStats or None,
+        The statistics of the search, None if not enabled.
 
     """
 
@@ -48,44 +88,112 @@ class BasicGameTree:
 
     _clazz_queue = LifoQueue  # The Game Tree using depth-first search
 
-    def __init__(self, root=None, depth_limit=None):
+    _support_transposition = True
+
+    _supported_storages = ('nodes', 'array', 'stream')
+
+    def __init__(self, root=None, depth_limit=None, transposition=False,
+                 symmetry=False, storage='nodes', evaluate=evaluate_node,
+                 stats=False):
         start_time = time.time()
         if root is None:
             root = Node()
+        if transposition and not self._support_transposition:
+            raise ValueError(
+                f"{type(self).__name__} does not support transposition")
+        if storage not in self._supported_storages:
+            raise ValueError(
+                f"{type(self).__name__} does not support the storage {storage!r}")
+        if storage == 'array' and symmetry:
+            raise ValueError("the array storage does not support symmetry")
+        if storage == 'array' and depth_limit:
+            raise ValueError("the array storage does not support depth_limit")
+        if storage == 'stream' and (transposition or symmetry):
+            raise ValueError(
+                "the stream storage does not support transposition or symmetry")
         self.root = root
         self.depth_limit = depth_limit
+        self.transposition = transposition
+        self.symmetry = symmetry
+        self.storage = storage
+        self.evaluate = evaluate
+        if depth_limit:
+            # the nodes beyond the depth limit are not scored
+            self.renew = True
         self.layers = []
         self.scores = {}
+        self._transpositions = {root: root}
+        self._symmetric_keys = {self._get_key(root)}
+        self._array = None
+        self._layer_summaries = []
+        self.stats = None
+        if stats:
+            self.stats = SearchStats()
+            self.stats.instrument(self)
+
+        if storage == 'array':
+            # expand and score all nodes in arrays
+            self._array = ArrayTreeStorage(root, depth_limit, self._backup)
+        elif storage == 'stream':
+            # expand and score nodes at once, depth first
+            self._score_streaming()
+        else:
+            self._frontiers = self._clazz_queue()
+            self._put(self.root)
 
-        self._frontiers = self._clazz_queue()
-        self._put(self.root)
-
-        # expand all nodes automatically
-        self._expand_all()
+            # expand all nodes automatically
+            self._expand_all()
 
-        # score all nodes after expanding
-        self._score_all()
+            # score all nodes after expanding
+            self._score_all()
 
         # record the building time
         self.building_time = time.time() - start_time
 
     def transfer(self, root):
         "create a new tree from the root"
-        return type(self)(root, depth_limit=self.depth_limit)
+        return type(self)(root, depth_limit=self.depth_limit,
+                          transposition=self.transposition,
+                          symmetry=self.symmetry, storage=self.storage,
+                          evaluate=self.evaluate, stats=self.stats is not None)
 
     def show(self):
         "print size of each layers"
         print(f'building time of the tree: {self.building_time:.2f}s')
         print("depth    size    score_distribution")
-        for depth, layer in enumerate(self.layers):
-            size = len(layer)
-            print(f'{depth:<8d} {size:<7d} {self._get_distribution(layer)}')
-        print(f"total size: {sum(map(len, self.layers))}")
+        total_size = 0
+        for depth, (size, distribution) in enumerate(self._get_layer_summaries()):
+            print(f'{depth:<8d} {size:<7d} {distribution}')
+            total_size += size
+        print(f"total size: {total_size}")
+        if self.stats is not None:
+            self.stats.show()
+
+    def _get_layer_summaries(self):
+        "yield the size and the score distribution of each layer"
+        if self._array is not None:
+            for depth in range(len(self._array.layer_offsets) - 1):
+                distribution = {0: 0, 1: 0, -1: 0, -inf: 0, inf: 0}
+                turn = self.root.turn * (-1) ** depth
+                scores = self._array.get_layer_scores(depth)
+                for score in scores:
+                    if score == UNSCORED:
+                        score = inf * turn
+                    distribution[score] += 1
+                yield len(scores), distribution
+            return
+
+        if self.storage == 'stream':
+            yield from self._layer_summaries
+            return
+
+        for layer in self.layers:
+            yield len(layer), self._get_distribution(layer)
 
     def _get_distribution(self, layer):
         distribution = {0: 0, 1: 0, -1: 0, -inf: 0, inf: 0}
         for node in layer:
-            distribution[self.get_score(node)] += 1
+            _add_to_distribution(distribution, self.get_score(node))
         return distribution
 
     def _put(self, node):
@@ -110,15 +218,57 @@ class BasicGameTree:
         # record the node
         layer = self._get_layer(depth)
         layer.append(node)
+        if self._at_horizon(node):
+            return
 
         # expand the node
         children = node.expand()
+        if self.transposition:
+            children = self._merge_transpositions(node)
+        if self.symmetry:
+            children = self._skip_symmetric_children(children)
 
         # put children to frontiers
         if to_put:
             for child in children:
                 self._put(child)
 
+    def _at_horizon(self, node):
+        "check if the node is at the depth limit"
+        return bool(self.depth_limit) and (
+            node.depth - self.root.depth >= self.depth_limit)
+
+    def _merge_transpositions(self, node):
+        """
+        replace children of the node with the known nodes of the same position,
+        return the children that have not been seen before
+
+        """
+        new_children = []
+        for ind, child in enumerate(node.children):
+            known = self._transpositions.setdefault(child, child)
+            if known is child:
+                new_children.append(child)
+            else:
+                node.children[ind] = known
+        return new_children
+
+    def _skip_symmetric_children(self, children):
+        "return children whose symmetric positions have not been seen before"
+        new_children = []
+        for child in children:
+            key = self._get_key(child)
+            if key not in self._symmetric_keys:
+                self._symmetric_keys.add(key)
+                new_children.append(child)
+        return new_children
+
+    def _get_key(self, node):
+        "return the key of the node in scores"
+        if self.symmetry:
+            return node.canonical_key, node.turn
+        return node
+
     def _get_layer(self, depth):
         if len(self.layers) <= depth:
             layer = []
@@ -133,29 +283,106 @@ class BasicGameTree:
             for node in layer:
                 self._score(node)
 
+    def _score_streaming(self):
+        """
+        expand and score nodes in depth-first post-order,
+        a node is scored once all its children are scored,
+        then its children are dropped, except the children of the root
+
+        """
+        # the stack of [node, children, scores of the scored children]
+        stack = []
+        node = self.root
+        while True:
+            # go down until a leaf
+            while not (node.terminated or self._at_horizon(node)):
+                children = self._expand_streaming(node)
+                stack.append([node, children, []])
+                node = children[0]
+            score = self._record_streaming(node)
+
+            # go up until a node with unscored children
+            while stack:
+                parent, children, child_scores = stack[-1]
+                child_scores.append(score)
+                if len(child_scores) < len(children):
+                    break
+                stack.pop()
+                score = self._record_streaming(
+                    parent, self._backup(parent.turn, child_scores))
+                if parent is not self.root:
+                    parent.clear_children()
+            if not stack:
+                return
+            node = children[len(child_scores)]
+
+    def _expand_streaming(self, node):
+        "expand the node in the stream storage"
+        return node.expand()
+
+    def _record_streaming(self, node, score=None):
+        """
+        record the score of the node into the layer summaries,
+        the score of a leaf is computed if not given
+
+        """
+        if score is None:
+            score = node.winner if node.terminated else self.evaluate(node)
+        depth = node.depth - self.root.depth
+        while len(self._layer_summaries) <= depth:
+            self._layer_summaries.append(
+                [0, {0: 0, 1: 0, -1: 0, -inf: 0, inf: 0}])
+        summary = self._layer_summaries[depth]
+        summary[0] += 1
+        _add_to_distribution(summary[1], score)
+
+        # only the root and its children are selected by NodeSelector
+        if depth <= 1:
+            self.scores[node] = score
+        return score
+
     def _score(self, node):
         "score the given node by minimax"
         if node.terminated:
             score = node.winner
+        elif self._at_horizon(node):
+            score = self.evaluate(node)
         else:
             child_scores = map(self.get_score, node.children)
-
-            # select the maximum score in +1 turn and minimum score in -1 turn
-            if node.turn > 0:
-                func = max
-            else:
-                func = min
-            score = func(child_scores)
-        self.scores[node] = score
+            score = self._backup(node.turn, child_scores)
+        self.scores[self._get_key(node)] = score
+
+    @staticmethod
+    def _backup(turn, child_scores):
+        "return the score of a node from the scores of its children by minimax"
+        # select the maximum score in +1 turn and minimum score in -1 turn
+        if turn > 0:
+            func = max
+        else:
+            func = min
+        return func(child_scores)
 
     def get_score(self, node):
         "get score of the given node"
+        if self._array is not None:
+            ind = self._array.find(node)
+            if ind >= 0 and self._array.scores[ind] != UNSCORED:
+                return self._array.scores[ind]
+            return inf * node.turn
+
         try:
-            return self.scores[node]
+            return self.scores[self._get_key(node)]
         except KeyError:
             # return the -inf, so we can ignore nodes without score during selecting
             return inf * node.turn
 
+    def _has_score(self, node):
+        "check if get_score finds a stored score of the node"
+        if self._array is not None:
+            ind = self._array.find(node)
+            return ind >= 0 and self._array.scores[ind] != UNSCORED
+        return self._get_key(node) in self.scores
+
 
 if __name__ == '__main__':
     # sample usage
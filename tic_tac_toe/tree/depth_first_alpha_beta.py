@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:05:47 2026
+
+The DepthFirstAlphaBetaTree Class
+
+"""
+import time
+from math import inf
+
+from tic_tac_toe.tree.basic_game_tree import BasicGameTree
+from tic_tac_toe.winning_detector import ThreatCounter
+
+
+# flags of the scores in the transposition table
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class _SearchTimeout(Exception):
+    "The time limit is reached during searching"
+
+
+class DepthFirstAlphaBetaTree(BasicGameTree):
+    """
+    Game tree using a depth-first Negamax search with Alpha-Beta pruning.
+    The search runs on bitmasks of the board instead of Node objects.
+    It passes (alpha, beta) windows down the current path and only keeps
+    the path and a bounded transposition table, instead of the whole tree.
+    Moves are ordered by the best move in the transposition table,
+    killer moves of the same depth and the history heuristic.
+    The marks on every winning line are counted by a ThreatCounter
+    updated on every move, so immediate wins and forced blocks
+    are found without checking the lines from scratch.
+
+    With a time limit, the root is searched by iterative deepening,
+    and the scores of the root's children come from the last finished depth.
+
+    params
+    ------
+    root : Node or None,
+        The root of the tree. None means starting from an empty board.
+    depth_limit : int or None,
+        The depth limit of the search. None means no depth limit.
+        Positions at the depth limit are scored as 0,
+        not by an evaluation like the trees of BasicGameTree.
+    table_size : int,
+        The maximum number of positions in the transposition table.
+        The oldest position is dropped when the table is full.
+    time_limit : float or None,
+        The time limit of the iterative deepening. None means to search
+        the root completely without iterative deepening.
+    stats : bool,
+        Count and time the search in a SearchStats, shown by show().
+        The default is False.
+
+    attributes
+    ----------
+    count_searched : int,
+        The number of positions visited by the search.
+    depth_finished : int,
+        The depth of the last finished iteration of the iterative deepening.
+    best_move : Node or None,
+        The best child of the root found by the last finished iteration.
+    renew : bool,
+        Requiring renew after selecting the next node or not,
+        True if there is a time limit.
+    building_time : float,
+        The building time of the tree, in seconds.
+
+    """
+
+    def __init__(self, root=None, depth_limit=None, table_size=1000000,
+                 time_limit=None, stats=False):
+        self.table_size = table_size
+        self.time_limit = time_limit
+        self.count_searched = 0
+        self.depth_finished = 0
+        self.best_move = None
+        self._table = {}
+        self._root_scores = {}
+        self._horizon = depth_limit
+        self._deadline = None
+        self._reached_horizon = False
+        self._killers = []
+        self._history = []
+        self._counter = None
+        self._full = 0
+        super().__init__(root=root, depth_limit=depth_limit, stats=stats)
+        self.renew = time_limit is not None
+
+    def transfer(self, root):
+        "create a new tree from the root"
+        return type(self)(root, depth_limit=self.depth_limit,
+                          table_size=self.table_size, time_limit=self.time_limit,
+                          stats=self.stats is not None)
+
+    def show(self):
+        "print the statistics of the search"
+        print(f'building time of the tree: {self.building_time:.2f}s')
+        print(f'number of searched positions: {self.count_searched}')
+        print(f'size of the transposition table: {len(self._table)}')
+        if self.time_limit is not None:
+            print(f'depth of the last finished iteration: {self.depth_finished}')
+        print(f'score of the root: {self.get_score(self.root)}')
+        if self.stats is not None:
+            self.stats.show()
+
+    def _expand_all(self):
+        "search the root, the scores of other nodes are searched when required"
+        n_cells = self.root.size * self.root.size
+        self._killers = [[] for _ in range(n_cells + 1)]
+        self._history = [0] * n_cells
+        if self.time_limit is None:
+            self.get_score(self.root)
+        else:
+            self._deepen_iteratively()
+
+    def _deepen_iteratively(self):
+        """
+        search the children of the root depth by depth until the time limit,
+        and keep the scores of the last finished depth
+
+        """
+        if self.root.terminated:
+            return
+        self._deadline = time.time() + self.time_limit
+        children = self.root.expand()
+        max_depth = len(children)
+        if self.depth_limit:
+            max_depth = min(max_depth, self.depth_limit)
+
+        for depth in range(1, max_depth + 1):
+            self._horizon = depth
+            self._reached_horizon = False
+            scores = {}
+            try:
+                for child in children:
+                    scores[child] = self._search(child, depth=1)
+            except _SearchTimeout:
+                break
+            self._root_scores = scores
+            self.depth_finished = depth
+
+            # search the principal variation first in the next depth
+            children = sorted(children, key=lambda x: -scores[x] * self.root.turn)
+            self.best_move = children[0]
+
+            # the scores are exact if no position is cut by the horizon
+            if not self._reached_horizon:
+                break
+        self._deadline = None
+        self._horizon = self.depth_limit
+
+    def _score_all(self):
+        "the depth-first tree scores nodes while searching"
+        return
+
+    def get_score(self, node):
+        "get score of the given node"
+        if node.terminated:
+            return node.winner
+
+        if self.time_limit is not None:
+            # the scores of the last finished depth
+            if node == self.root and self._root_scores:
+                return max(self._root_scores.values(),
+                           key=lambda x: x * node.turn)
+            return self._root_scores.get(node, inf * node.turn)
+
+        return self._search(node)
+
+    def _has_score(self, node):
+        "check if get_score finds the score of the node without searching"
+        if node.terminated:
+            return True
+        if self.time_limit is not None:
+            if node == self.root:
+                return bool(self._root_scores)
+            return node in self._root_scores
+
+        # the same conditions as the lookup of the full window in _negamax
+        entry = self._table.get(node.key << 1 | (node.turn > 0))
+        if entry is None or entry[2] < (self._horizon or inf):
+            return False
+        score, flag, _, _ = entry
+        return (flag == EXACT or (flag == LOWER_BOUND and score >= 1)
+                or (flag == UPPER_BOUND and score <= -1))
+
+    def _search(self, node, depth=0):
+        "search the node with a full window, return the score of the node"
+        if node.terminated:
+            return node.winner
+
+        mask_1, mask_2 = node.masks
+        if node.turn > 0:
+            own, other = mask_1, mask_2
+        else:
+            own, other = mask_2, mask_1
+        self._counter = ThreatCounter(node.size, node.length, mask_1, mask_2,
+                                      two_steps=False)
+        self._full = (1 << node.size * node.size) - 1
+        score = self._negamax(own, other, node.key, node.turn, -1, 1, depth)
+        return score * node.turn
+
+    def _negamax(self, own, other, key, turn, alpha, beta, depth):
+        """
+        return the score of the position for the player to move
+
+        params
+        ------
+        own, other : int,
+            The bitmasks of the player to move and the opposite player.
+        key : int,
+            The base-3 key of the board (Node.key).
+        turn : 1 or -1,
+            The player to move.
+        alpha, beta : int,
+            The search window.
+        depth : int,
+            The depth from the root of the search.
+
+        """
+        self.count_searched += 1
+        if (self._deadline is not None and not self.count_searched & 1023
+                and time.time() > self._deadline):
+            raise _SearchTimeout()
+
+        # the opposite player has just made a tic-tac-toe
+        counter = self._counter
+        if counter.winner:
+            return -1
+
+        empty = self._full & ~(own | other)
+        if not empty:
+            return 0
+        if self._horizon:
+            remaining = self._horizon - depth
+            if remaining <= 0:
+                self._reached_horizon = True
+                return 0
+        else:
+            remaining = inf
+
+        # the player to move makes a tic-tac-toe in one step
+        if counter.threats[turn] and counter.get_threat_bits(turn, empty):
+            return 1
+        moves = empty
+        if remaining > 1 and counter.threats[-turn]:
+            threat_bits = counter.get_threat_bits(-turn, empty)
+            if threat_bits & (threat_bits - 1):
+                # more than one tic-tac-toe to block
+                return -1
+            if threat_bits:
+                # the only move not losing in two steps
+                moves = threat_bits
+
+        # look up the transposition table
+        table_key = key << 1 | (turn > 0)
+        alpha_original = alpha
+        entry = self._table.get(table_key)
+        if entry is not None and entry[2] >= remaining:
+            score, flag, _, _ = entry
+            if flag == EXACT:
+                return score
+            if flag == LOWER_BOUND:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        digit = 1 if turn > 0 else 2
+        best = -inf
+        best_bit = -1
+        for bit in self._order_moves(moves, entry, depth):
+            counter.make(bit, turn)
+            score = -self._negamax(other, own | 1 << bit, key + digit * 3 ** bit,
+                                   -turn, -beta, -alpha, depth + 1)
+            counter.unmake(bit, turn)
+            if score > best:
+                best = score
+                best_bit = bit
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    self._record_cutoff(bit, depth, empty)
+                    break
+
+        # store the score
+        if best <= alpha_original:
+            flag = UPPER_BOUND
+        elif best >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._store(table_key, best, flag, remaining, best_bit)
+        return best
+
+    def _order_moves(self, empty, entry, depth):
+        """
+        return empty bits in the searching order: the best move in the
+        transposition table, killer moves, then by the history heuristic
+
+        """
+        bits = []
+        while empty:
+            lowest = empty & -empty
+            empty ^= lowest
+            bits.append(lowest.bit_length() - 1)
+
+        best_bit = entry[3] if entry is not None else -1
+        killers = self._killers[depth]
+        history = self._history
+        bits.sort(key=lambda x: (x != best_bit, x not in killers, -history[x]))
+        return bits
+
+    def _record_cutoff(self, bit, depth, empty):
+        "remember the move causing a beta cutoff"
+        killers = self._killers[depth]
+        if bit not in killers:
+            killers.insert(0, bit)
+            del killers[2:]
+        # moves near the root are more important
+        self._history[bit] += bin(empty).count('1') ** 2
+
+    def _store(self, table_key, score, flag, remaining, best_bit):
+        """
+        store a score into the bounded transposition table,
+        with the remaining depth that the score was searched to
+        and the best move of the position
+
+        """
+        if table_key not in self._table and len(self._table) >= self.table_size:
+            # drop the oldest position
+            del self._table[next(iter(self._table))]
+        self._table[table_key] = (score, flag, remaining, best_bit)
+
+
+if __name__ == '__main__':
+    # sample usage
+
+    # build tree from the empty board by default
+    tree = DepthFirstAlphaBetaTree()
+
+    # show the statistics of the search
+    tree.show()
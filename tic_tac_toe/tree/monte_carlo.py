@@ -7,11 +7,142 @@ Created on Fri Nov 17 12:34:02 2023
 class MonteCarloTree
 
 """
+import random
 import time
-from math import inf, log
-from random import choice
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import inf, log, sqrt
+from tic_tac_toe.node import Node
 from tic_tac_toe.tree.basic_game_tree import BasicGameTree
 from tic_tac_toe.winning_detector import WinningDetector
+from tic_tac_toe.winning_lines import get_winning_lines
+
+
+def play_randomly(own, other, turn, empty_bits, masks_through,
+                  func_shuffle=random.shuffle):
+    """
+    play a random game on bitmasks without creating any node
+
+    params
+    ------
+    own, other : int,
+        The bitmasks of the player to move and the opposite player.
+    turn : 1 or -1,
+        The player to move.
+    empty_bits : list of int,
+        The empty bits of the board, will be shuffled in place.
+    masks_through : tuple,
+        WinningLines.masks_through of the board.
+    func_shuffle : callable,
+        The function to shuffle empty_bits in place.
+
+    returns
+    -------
+    winner : 1, 0 or -1,
+        The winner of the game.
+
+    """
+    func_shuffle(empty_bits)
+    for bit in empty_bits:
+        own |= 1 << bit
+        # only the new mark can make a tic-tac-toe
+        for line in masks_through[bit]:
+            if own & line == line:
+                return turn
+        own, other = other, own
+        turn = -turn
+    return 0
+
+
+def play_batch(state, size, length, n_rollouts, func_shuffle=random.shuffle):
+    """
+    play random games from the same position
+
+    params
+    ------
+    state : tuple,
+        (own, other, turn, empty_bits) of the position, see play_randomly.
+    size : int,
+        The size of the game board.
+    length : int,
+        The winning number of marks in a row.
+    n_rollouts : int,
+        The number of random games.
+    func_shuffle : callable,
+        The function to shuffle the empty bits in place.
+
+    returns
+    -------
+    draw_win_lose : [int, int, int],
+        The numbers of draw, MAX win and MIN win.
+
+    """
+    own, other, turn, empty_bits = state
+    masks_through = get_winning_lines(size, length).masks_through
+    draw_win_lose = [0, 0, 0]
+    for _ in range(n_rollouts):
+        # the shuffled empty_bits can be shuffled again
+        winner = play_randomly(own, other, turn, empty_bits, masks_through,
+                               func_shuffle)
+        draw_win_lose[winner] += 1
+    return draw_win_lose
+
+
+def _get_rollout_state(node):
+    "return (own, other, turn, empty_bits) of the node for random games"
+    mask_1, mask_2 = node.masks
+    if node.turn > 0:
+        own, other = mask_1, mask_2
+    else:
+        own, other = mask_2, mask_1
+    empty = ~(mask_1 | mask_2)
+    empty_bits = [bit for bit in range(node.size * node.size) if empty >> bit & 1]
+    return own, other, node.turn, empty_bits
+
+
+def _search_from_root(root_state, seed, kwargs):
+    """
+    build a MonteCarloTree in a worker process
+
+    params
+    ------
+    root_state : tuple,
+        (data, turn, depth, length) of the root.
+    seed : int,
+        The random seed of the worker.
+    kwargs : dict,
+        Keyword parameters of the tree.
+
+    returns
+    -------
+    count_simulations : int,
+        The total simulation times of the worker.
+    root_result : [int, int, int],
+        The simulation result of the root.
+    child_results : list of (int, [int, int, int]),
+        The key of every child of the root and its simulation result.
+
+    """
+    data, turn, depth, length = root_state
+    root = Node(data, turn, depth=depth, length=length)
+    tree = MonteCarloTree(root, seed=seed, **kwargs)
+    child_results = [(child.key, tree.get_simulation(child))
+                     for child in root.children]
+    return tree.count_simulations, tree.get_simulation(root), child_results
+
+
+class _Statistics:
+    """
+    the simulation results of a node and the statistics of its children,
+    the children are in the same positions as node.children
+
+    """
+
+    __slots__ = ('node', 'simulation', 'children')
+
+    def __init__(self, node, simulation):
+        self.node = node
+        self.simulation = simulation  # shared with MonteCarloTree.scores
+        self.children = None
 
 
 class MonteCarloTree(BasicGameTree):
@@ -24,12 +155,42 @@ class MonteCarloTree(BasicGameTree):
     root : Node or None,
         The given root of the tree. None means to start from an empty board.
     depth_limit : int or None,
-        The depth limit of the tree, should only use on Monte Carlo Tree.
-        None means no depth limit.
+        Kept for the interface of BasicGameTree, the selection
+        and the random games are not limited by it.
     time_limit : float,
         The time limit of tree building.
+        It is ignored if iterations or max_simulations is given.
     exploration_weight : float,
         The weight to choose nodes with fewer simulations.
+    rollouts_per_leaf : int,
+        The number of random games played from a selected node at once.
+        Their results are backpropagated in a single update. The default is 1.
+    workers : int,
+        The number of worker processes. The default is 1.
+    parallel : "root" or "tree",
+        The strategy to use more than 1 worker. The default is "root".
+        "root": every worker builds an independent tree from the root with
+        a different seed, and the results of the root's children are merged
+        after the time limit.
+        "tree": the tree is shared and selected in this process. Distinct
+        leaves are selected by adding virtual losses on their branches,
+        and simulated in the workers. The virtual losses are removed when
+        the results are backpropagated.
+    iterations : int or None,
+        The number of selections to build the tree, instead of the time limit.
+        Every worker of the root-parallel search runs all the iterations.
+    max_simulations : int or None,
+        The number of simulations to build the tree, instead of the time limit.
+        Every worker of the root-parallel search runs all the simulations.
+    seed : int or None,
+        The seed of the random games of this tree. With a seed and a budget
+        of iterations or simulations, the tree is built the same way
+        every time. The random games of the tree-parallel search are
+        seeded too, but their results arrive in an unpredictable order.
+        None means an unpredictable seed.
+    stats : bool,
+        Count and time the search in a SearchStats, shown by show().
+        The default is False.
 
     attributes
     ----------
@@ -43,6 +204,10 @@ class MonteCarloTree(BasicGameTree):
         The building time of the tree, in seconds.
     count_simulations : int,
         The total simulation times.
+    select_time, simulate_time, backpropagate_time : float,
+        The time spent in every step of the search, in seconds,
+        the time of expanding the selected node is in select_time.
+        Only measured without parallel workers.
     renew : bool,
         Requiring renew after selecting the next node or not.
 
@@ -51,27 +216,69 @@ class MonteCarloTree(BasicGameTree):
     renew = True
 
     def __init__(self, root=None, depth_limit=None, time_limit=0.5,
-                 exploration_weight=1.41):
-        super().__init__(root=root, depth_limit=depth_limit)
+                 exploration_weight=1.41, rollouts_per_leaf=1, workers=1,
+                 parallel='root', iterations=None, max_simulations=None,
+                 seed=None, stats=False):
+        if parallel not in ('root', 'tree'):
+            raise ValueError(f"unknown parallel strategy {parallel!r}")
+        super().__init__(root=root, depth_limit=depth_limit, stats=stats)
         start = time.time()
         self.time_limit = time_limit
         self.exploration_weight = exploration_weight
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.workers = workers
+        self.parallel = parallel
+        self.iterations = iterations
+        self.max_simulations = max_simulations
+        self.seed = seed
+        self._random = random.Random(seed)
         self.__create_winning_detector(self.root)
         self.count_simulations = 0
-
-        self._expand_all_mcts()
+        self.select_time = self.simulate_time = self.backpropagate_time = 0
+        self._root_statistics = None
+        self._counter_moves = []  # (node, bit, player) made on the counter
+
+        if workers > 1 and parallel == 'tree':
+            self._expand_all_tree_parallel()
+        elif workers > 1:
+            self._expand_all_in_parallel()
+        else:
+            self._expand_all_mcts()
         self.building_time = time.time() - start
 
     def transfer(self, root):
         "return the tree from the given root"
         return type(self)(root=root,
-                          depth_limit=self.depth_limit, time_limit=self.time_limit)
+                          depth_limit=self.depth_limit, time_limit=self.time_limit,
+                          exploration_weight=self.exploration_weight,
+                          rollouts_per_leaf=self.rollouts_per_leaf,
+                          workers=self.workers, parallel=self.parallel,
+                          iterations=self.iterations,
+                          max_simulations=self.max_simulations,
+                          seed=self._get_next_seed(),
+                          stats=self.stats is not None)
+
+    def _get_next_seed(self):
+        "return a seed from the random generator of the tree if seeded"
+        if self.seed is None:
+            return None
+        return self._random.getrandbits(32)
+
+    def _within_budget(self, start, count_iterations):
+        "check if the tree can be expanded by the budget or the time limit"
+        if self.iterations is None and self.max_simulations is None:
+            return time.time() - start < self.time_limit
+        if self.iterations is not None and count_iterations >= self.iterations:
+            return False
+        return (self.max_simulations is None
+                or self.count_simulations < self.max_simulations)
 
     def __create_winning_detector(self, root):
         "create the winning pattern detector for the game board"
-        size = len(root.data)
+        size = root.size
         length = root.length
         self._winning_detector = WinningDetector(size, length)
+        self._threat_counter = self._winning_detector.create_counter(root)
 
     def simulate(self, node):
         "perform one simulation for the node"
@@ -82,15 +289,83 @@ class MonteCarloTree(BasicGameTree):
         if winner:
             return winner, to_expand
 
-        while not node.terminated:
-            # randomly explore
-            index = choice(list(node.coordinates.get(0, set())))
-            node = node.expand_one(index)
-        return node.winner, True
+        if node.terminated:
+            return node.winner, True
+        own, other, turn, empty_bits = _get_rollout_state(node)
+        masks_through = get_winning_lines(node.size, node.length).masks_through
+        return play_randomly(own, other, turn, empty_bits, masks_through,
+                             self._random.shuffle), True
+
+    def simulate_batch(self, node, n_rollouts):
+        """
+        perform simulations for the node
+
+        returns
+        -------
+        draw_win_lose : [int, int, int],
+            The numbers of draw, MAX win and MIN win.
+        to_expand : bool,
+            Whether to expand the node.
+
+        """
+        self.count_simulations += n_rollouts
+        draw_win_lose = [0, 0, 0]
+
+        # detect some winning patterns
+        winner, to_expand = self._stop_early(node)
+        if winner:
+            draw_win_lose[winner] = n_rollouts
+            return draw_win_lose, to_expand
+
+        if node.terminated:
+            draw_win_lose[node.winner] = n_rollouts
+            return draw_win_lose, True
+        draw_win_lose = play_batch(_get_rollout_state(node), node.size,
+                                   node.length, n_rollouts, self._random.shuffle)
+        return draw_win_lose, True
+
+    def _detect(self, node):
+        """
+        detect the winning patterns of a node in the tree,
+        by the threat counter if it is on the node of the last selection path
+
+        """
+        if node.terminated:
+            result = [0, 0, 0]
+            result[node.winner] = 1
+            return result
+
+        moves = self._counter_moves
+        if node is (moves[-1][0] if moves else self.root):
+            return self._threat_counter.detect(node.turn)
+        return self._winning_detector.detect(node)
+
+    def _move_counter(self, depth, parent, child):
+        """
+        make the move from the parent to the child on the threat counter,
+        the moves above the depth are kept if they are on the same path
+
+        """
+        moves = self._counter_moves
+        if depth < len(moves) and moves[depth][0] is child:
+            return
+        self._unmake_counter(depth)
+        parent_1, parent_2 = parent.masks
+        child_1, child_2 = child.masks
+        bit = ((child_1 | child_2) ^ (parent_1 | parent_2)).bit_length() - 1
+        self._threat_counter.make(bit, parent.turn)
+        moves.append((child, bit, parent.turn))
+
+    def _unmake_counter(self, depth):
+        "undo the moves on the threat counter below the depth"
+        moves = self._counter_moves
+        while len(moves) > depth:
+            _, bit, player = moves.pop()
+            self._threat_counter.unmake(bit, player)
 
     def _stop_early(self, node):
         "stop simulation if the node has some winning pattern"
-        draw, win, lose = self._winning_detector.detect(node)
+        draw, win, lose = self._detect(node)
         if self.root.turn < 0:
             if win:
                 # dont expand if an extreme disadvantage detected
@@ -105,53 +380,87 @@ class MonteCarloTree(BasicGameTree):
                 return 1, True
         return 0, True
 
-    def _score(self, node):
-        "score the node by simulation"
-        winner, to_expand = self.simulate(node)
-        self._backpropagate(node, winner)
-        return to_expand
+    @staticmethod
+    def _backpropagate(path, draw_win_lose):
+        """
+        add the results of simulations to nodes on the whole branch
 
-    def _backpropagate(self, node, winner):
-        "update the result for nodes on the whole branch"
-        self.get_simulation(node)[winner] += 1
-        if node == self.root:
-            return
+        params
+        ------
+        path : list of _Statistics,
+            The selection path from the root to the simulated node.
+        draw_win_lose : [int, int, int],
+            The numbers of draw, MAX win and MIN win,
+            of any number of simulations.
 
-        self._backpropagate(node.parent, winner)
+        """
+        draw, win, lose = draw_win_lose
+        for statistics in path:
+            simulation = statistics.simulation
+            simulation[0] += draw
+            simulation[1] += win
+            simulation[2] += lose
 
     def select(self):
         "select the next node to expand from root, but not frontiers"
-        node = self.root
-        while node.children:
-            node = min(node.children, key=self._get_priority)
-        return node
+        return self._select_path()[-1].node
 
-    def _get_priority(self, node):
-        "the priority of expanding"
-        draw_win_lose = self.get_simulation(node)
-        node_rollouts = sum(draw_win_lose)
-
-        # compute exploitation
-        try:
-            # draw is better than lose
-            draw_factor = int(bool(draw_win_lose[0]))  # = 1 if any draw
+    def _select_path(self):
+        """
+        select the next node to expand from root, but not frontiers,
+        return the statistics of the nodes on the path from the root
 
-            exploitation = (draw_win_lose[-node.turn] + draw_factor
-                            ) / node_rollouts
-        except ZeroDivisionError:
-            return -inf
+        """
+        # the exploration term of every child shares the same log
+        if self.exploration_weight and self.count_simulations:
+            exploration_factor = (self.exploration_weight
+                                  * sqrt(log(self.count_simulations)))
+        else:
+            exploration_factor = 0
 
-        if (not self.exploration_weight
-                or node == self.root):
-            return -exploitation
+        if self._root_statistics is None:
+            self._root_statistics = _Statistics(self.root,
+                                                self.get_simulation(self.root))
+        node = self.root
+        statistics = self._root_statistics
+        path = [statistics]
+        while node.children:
+            if statistics.children is None:
+                statistics.children = [_Statistics(child, self.get_simulation(child))
+                                       for child in node.children]
+            statistics = self._select_child(statistics.children, node.turn,
+                                            exploration_factor)
+            # only the moves off the last path are made on the threat counter
+            self._move_counter(len(path) - 1, node, statistics.node)
+            node = statistics.node
+            path.append(statistics)
+        self._unmake_counter(len(path) - 1)
+        return path
+
+    @staticmethod
+    def _select_child(children, turn, exploration_factor):
+        """
+        return the statistics of the child with the highest UCT value,
+        an unvisited child is selected first
 
-        # compute exploration
-        if not self.count_simulations or not node_rollouts:
-            return -inf
-        exploration = (self.exploration_weight *
-                       (log(self.count_simulations) / node_rollouts)**0.5)
+        """
+        best = None
+        best_value = -inf
+        for child in children:
+            draw, win, lose = child.simulation
+            rollouts = draw + win + lose
+            if not rollouts:
+                return child
 
-        return -(exploitation + exploration)
+            # draw is better than lose
+            wins = win if turn > 0 else lose
+            value = (wins + (draw > 0)) / rollouts
+            if exploration_factor:
+                value += exploration_factor / sqrt(rollouts)
+            if value > best_value:
+                best = child
+                best_value = value
+        return best
 
     def _score_all(self):
         "Monte Carlo Tree will score nodes while expanding"
@@ -168,15 +477,125 @@ class MonteCarloTree(BasicGameTree):
 
         # expand if there is time
         start = time.time()
-        while time.time() - start < self.time_limit:
+        count_iterations = 0
+        while self._within_budget(start, count_iterations):
             self._expand_next()
+            count_iterations += 1
+
+    def _expand_all_in_parallel(self):
+        "build trees from the root in worker processes and merge their results"
+        self.root.clear_children()
+        self._expand_the_node(self.root)
+        children = {child.key: child for child in self.root.children}
+        self._get_layer(1).update(children.values())
+
+        root_state = (self.root.data, self.root.turn, self.root.depth,
+                      self.root.length)
+        kwargs = {'depth_limit': self.depth_limit,
+                  'time_limit': self.time_limit,
+                  'exploration_weight': self.exploration_weight,
+                  'rollouts_per_leaf': self.rollouts_per_leaf,
+                  'iterations': self.iterations,
+                  'max_simulations': self.max_simulations}
+        seeds = [self._random.getrandbits(32) for _ in range(self.workers)]
+        with ProcessPoolExecutor(self.workers) as executor:
+            futures = [executor.submit(_search_from_root, root_state, seed, kwargs)
+                       for seed in seeds]
+            results = [future.result() for future in futures]
+
+        for count_simulations, root_result, child_results in results:
+            self.count_simulations += count_simulations
+            self._merge_simulation(self.root, root_result)
+            for key, draw_win_lose in child_results:
+                self._merge_simulation(children[key], draw_win_lose)
+
+    def _expand_all_tree_parallel(self):
+        "select distinct leaves with virtual losses and simulate them in workers"
+        self.root.clear_children()
+        pending = {}  # future - selection path
+        start = time.time()
+        count_iterations = 0
+        with ProcessPoolExecutor(self.workers) as executor:
+            while self._within_budget(start, count_iterations):
+                # keep every worker busy
+                while (len(pending) < 2 * self.workers
+                       and self._within_budget(start, count_iterations)):
+                    path = self._select_path()
+                    if any(path[-1] is x[-1] for x in pending.values()):
+                        break
+                    self._submit(executor, path, pending)
+                    count_iterations += 1
+
+                if pending:
+                    timeout = None
+                    if self.iterations is None and self.max_simulations is None:
+                        timeout = self.time_limit - (time.time() - start)
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED,
+                                   timeout=timeout)
+                    for future in done:
+                        self._receive(future, pending)
+
+            for future in list(pending):
+                self._receive(future, pending)
+
+    def _submit(self, executor, path, pending):
+        "simulate the node in a worker, or score it here if it stops early"
+        node = path[-1].node
+        winner, to_expand = self._stop_early(node)
+        if winner or node.terminated:
+            draw_win_lose = [0, 0, 0]
+            draw_win_lose[winner or node.winner] = self.rollouts_per_leaf
+            self.count_simulations += self.rollouts_per_leaf
+            self._backpropagate(path, draw_win_lose)
+            self._expand_the_node(node, to_expand)
+            return
+
+        self._add_virtual_loss(path, 1)
+        # the random games in the worker are seeded by the tree
+        func_shuffle = random.Random(self._random.getrandbits(32)).shuffle
+        future = executor.submit(play_batch, _get_rollout_state(node), node.size,
+                                 node.length, self.rollouts_per_leaf, func_shuffle)
+        pending[future] = path
+
+    def _receive(self, future, pending):
+        "backpropagate the result of a worker and remove the virtual losses"
+        path = pending.pop(future)
+        draw_win_lose = future.result()
+        self._add_virtual_loss(path, -1)
+        self.count_simulations += self.rollouts_per_leaf
+        self._backpropagate(path, draw_win_lose)
+        self._expand_the_node(path[-1].node, True)
+
+    @staticmethod
+    def _add_virtual_loss(path, count):
+        "add losses for the players who moved to the nodes on the whole branch"
+        for statistics in path:
+            # the player to move of the node wins
+            statistics.simulation[statistics.node.turn] += count
+
+    def _merge_simulation(self, node, draw_win_lose):
+        "add a simulation result to the node"
+        simulation = self.get_simulation(node)
+        for ind, count in enumerate(draw_win_lose):
+            simulation[ind] += count
 
     def _expand_next(self):
         "select an node to expand"
-        node = self.select()
-        to_expand = self._score(node)
+        start = time.perf_counter()
+        path = self._select_path()
+        node = path[-1].node
+        selected = time.perf_counter()
+        draw_win_lose, to_expand = self.simulate_batch(node, self.rollouts_per_leaf)
+        simulated = time.perf_counter()
+        self._backpropagate(path, draw_win_lose)
+        backpropagated = time.perf_counter()
         self._expand_the_node(node, to_expand)
 
+        # expanding is counted as a part of selecting
+        self.select_time += selected - start + time.perf_counter() - backpropagated
+        self.simulate_time += simulated - selected
+        self.backpropagate_time += backpropagated - simulated
+
     def _expand_the_node(self, node, to_expand=False):
         "expand the node and put it into the correct layer"
         # record the node
@@ -217,6 +636,17 @@ class MonteCarloTree(BasicGameTree):
         "show the layer size and score distribution of the tree"
         super().show()
         print(f"number of simulations: {self.count_simulations}")
+        if self.building_time:
+            print(f"simulations per second: "
+                  f"{self.count_simulations / self.building_time:.0f}")
+        total = self.select_time + self.simulate_time + self.backpropagate_time
+        if total:
+            print(f"time of select: {self.select_time:.2f}s "
+                  f"({self.select_time / total:.0%}), "
+                  f"simulate: {self.simulate_time:.2f}s "
+                  f"({self.simulate_time / total:.0%}), "
+                  f"backpropagate: {self.backpropagate_time:.2f}s "
+                  f"({self.backpropagate_time / total:.0%})")
 
     def _get_distribution(self, layer):
         distribution = {0: 0, 1: 0, -1: 0, -inf: 0, inf: 0}
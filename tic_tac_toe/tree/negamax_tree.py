@@ -10,17 +10,11 @@ class NegamaxGameTree(BasicGameTree):
     Maybe we can see the difference in the execution time of both trees.
 
     """
-    def _score(self, node):
-        "score the given node by negamax"
-        if node.terminated:
-            score = node.winner
-        else:
-            child_scores = map(self.get_score, node.children)
-
-            # select the maximum score in +1 turn and minimum score in -1 turn
-            score = node.turn * max([child*node.turn for child in child_scores])
-
-        self.scores[node] = score
+    @staticmethod
+    def _backup(turn, child_scores):
+        "return the score of a node from the scores of its children by negamax"
+        # select the maximum score in +1 turn and minimum score in -1 turn
+        return turn * max([child*turn for child in child_scores])
 
 
 if __name__ == '__main__':
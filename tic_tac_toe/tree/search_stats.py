@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:14:52 2026
+
+The SearchStats class
+
+"""
+import time
+from functools import wraps
+
+
+class SearchStats:
+    """
+    Counters and per-phase timers of a game tree.
+
+    The tree is instrumented by wrapping its methods on the instance,
+    so a tree without SearchStats runs its methods as they are,
+    without any cost.
+
+    attributes
+    ----------
+    nodes : int,
+        The number of nodes created by expanding.
+    expands : int,
+        The number of expanded nodes.
+    winner_checks : int,
+        The number of nodes scored by checking their winner.
+    score_lookups : int,
+        The number of score lookups.
+    score_hits : int,
+        The number of score lookups finding a stored score,
+        as reported by the _has_score method of the tree.
+    pruned : int,
+        The number of branches pruned by AlphaBetaPruningTree.
+    detector_calls : int,
+        The number of winning pattern detections of MonteCarloTree.
+    times : dict,
+        phase(str) - time in seconds, "expand", "score" and "backpropagate".
+        The time of a phase includes other phases called inside it.
+
+    """
+
+    __slots__ = ('nodes', 'expands', 'winner_checks', 'score_lookups',
+                 'score_hits', 'pruned', 'detector_calls', 'times')
+
+    def __init__(self):
+        self.nodes = 0
+        self.expands = 0
+        self.winner_checks = 0
+        self.score_lookups = 0
+        self.score_hits = 0
+        self.pruned = 0
+        self.detector_calls = 0
+        self.times = {'expand': 0., 'score': 0., 'backpropagate': 0.}
+
+    def __repr__(self):
+        counters = ', '.join(f'{name}={getattr(self, name)}'
+                             for name in self.__slots__[:-1])
+        return f'{type(self).__name__}({counters})'
+
+    def instrument(self, tree):
+        "wrap the methods of the tree to update the statistics"
+        # method name - wrapper factory
+        wrappers = {
+            '_expand_the_node': self._wrap_expand,
+            '_expand_streaming': self._wrap_expand,
+            '_score': self._wrap_score,
+            '_record_streaming': self._wrap_score,
+            'simulate_batch': self._wrap_simulate,
+            'get_score': self._wrap_get_score,
+            '_backpropagate': self._wrap_backpropagate,
+            '_check_expanding': self._wrap_check_expanding,
+            '_stop_early': self._wrap_stop_early,
+            '_search': self._wrap_search,
+        }
+        for name, wrap in wrappers.items():
+            method = getattr(tree, name, None)
+            if method is not None:
+                setattr(tree, name, wrap(tree, method))
+
+    def _time(self, phase, method):
+        "return the method adding its running time to the phase"
+        times = self.times
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                times[phase] += time.perf_counter() - start
+        return wrapper
+
+    def _wrap_expand(self, tree, method):
+        timed = self._time('expand', method)
+
+        @wraps(method)
+        def wrapper(node, *args, **kwargs):
+            expanded = node.expanded
+            result = timed(node, *args, **kwargs)
+            if not expanded and node.expanded:
+                self.expands += 1
+                self.nodes += len(node.children)
+            return result
+        return wrapper
+
+    def _wrap_score(self, tree, method):
+        timed = self._time('score', method)
+
+        @wraps(method)
+        def wrapper(node, *args, **kwargs):
+            if node.terminated:
+                self.winner_checks += 1
+            return timed(node, *args, **kwargs)
+        return wrapper
+
+    def _wrap_simulate(self, tree, method):
+        # simulations score the nodes of Monte Carlo Tree
+        return self._time('score', method)
+
+    def _wrap_search(self, tree, method):
+        # the depth-first search scores the positions without nodes
+        return self._time('score', method)
+
+    def _wrap_get_score(self, tree, method):
+        @wraps(method)
+        def wrapper(node):
+            self.score_lookups += 1
+            if tree._has_score(node):
+                self.score_hits += 1
+            return method(node)
+        return wrapper
+
+    def _wrap_backpropagate(self, tree, method):
+        return self._time('backpropagate', method)
+
+    def _wrap_check_expanding(self, tree, method):
+        @wraps(method)
+        def wrapper(node):
+            to_expand = method(node)
+            if not to_expand:
+                self.pruned += 1
+            return to_expand
+        return wrapper
+
+    def _wrap_stop_early(self, tree, method):
+        @wraps(method)
+        def wrapper(node):
+            self.detector_calls += 1
+            return method(node)
+        return wrapper
+
+    def show(self):
+        "print the counters and the timers"
+        print(f'nodes created: {self.nodes}, expand calls: {self.expands}, '
+              f'winner checks: {self.winner_checks}')
+        print(f'score lookups: {self.score_lookups}, hits: {self.score_hits}, '
+              f'pruned branches: {self.pruned}, '
+              f'detector calls: {self.detector_calls}')
+        print('time of ' + ', '.join(f'{phase}: {seconds:.2f}s'
+                                     for phase, seconds in self.times.items()))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:41:09 2026
+
+The TablebaseTree Class
+
+"""
+from math import inf
+
+from tic_tac_toe.tablebase import get_tablebase
+from tic_tac_toe.tree.basic_game_tree import BasicGameTree
+
+
+class TablebaseTree(BasicGameTree):
+    """
+    Game tree answering the scores from a Tablebase in O(1),
+    the board is solved by retrograde analysis once per process.
+
+    params
+    ------
+    root : Node or None,
+        The root of the tree. None means starting from an empty board.
+    tablebase : Tablebase or None,
+        The tablebase of the board. None means to solve the board of the root.
+
+    attributes
+    ----------
+    tablebase : Tablebase,
+        The results of every position reachable from the empty board.
+    building_time : float,
+        The time to get the tablebase, in seconds.
+
+    """
+
+    def __init__(self, root=None, tablebase=None, stats=False):
+        self.tablebase = tablebase
+        super().__init__(root=root, stats=stats)
+
+    def transfer(self, root):
+        "create a new tree from the root"
+        return type(self)(root, tablebase=self.tablebase,
+                          stats=self.stats is not None)
+
+    def show(self):
+        "print the number of positions and the score distribution of each layer"
+        print(f'building time of the tree: {self.building_time:.2f}s')
+        distributions = self.tablebase.distributions
+        if distributions:
+            print("marks    size    score_distribution")
+            for n_marks, distribution in enumerate(distributions):
+                print(f'{n_marks:<8d} {sum(distribution.values()):<7d} '
+                      f'{distribution}')
+            print(f"total size: {sum(sum(x.values()) for x in distributions)}")
+        print(f'score of the root: {self.get_score(self.root)}')
+        if self.stats is not None:
+            self.stats.show()
+
+    def _expand_all(self):
+        "get the tablebase, every node is scored by it"
+        if self.tablebase is None:
+            self.tablebase = get_tablebase(self.root.size, self.root.length)
+
+    def _score_all(self):
+        "the tablebase has scored all nodes"
+        return
+
+    def get_score(self, node):
+        "get score of the given node"
+        score = self.tablebase.get_score(node)
+        if score is None:
+            # the position is not reachable from the empty board
+            return inf * node.turn
+        return score
+
+    def _has_score(self, node):
+        "check if the node is covered by the tablebase"
+        return node in self.tablebase
+
+
+if __name__ == '__main__':
+    # sample usage
+
+    # solve the board of the empty root by default
+    tree = TablebaseTree()
+
+    # show the size of each layer
+    tree.show()
@@ -7,14 +7,36 @@ Created on Sat Nov 18 18:28:22 2023
 functions to estimate the score for non-terminal states
 
 """
-from tic_tac_toe.node import DIRECTIONS
-from itertools import product
+from functools import lru_cache
+from tic_tac_toe.winning_lines import get_winning_lines
+
+
+@lru_cache(maxsize=None)
+def _get_winning_patterns(size, length):
+    "return the shared winning patterns of the game in specified size and length"
+    # player will win the game in one step
+    patterns_1 = get_winning_lines(size, length).masks
+
+    # player will win the game in two steps
+    patterns_2 = tuple(
+        # bitmask of the empty ends, bitmask of player's marks
+        (_to_mask(size, (line[0], line[-1])), _to_mask(size, line[1:-1]))
+        for line in get_winning_lines(size, length + 1).coordinates)
+    return patterns_1, patterns_2
+
+
+def _to_mask(size, coordinates):
+    "return the bitmask of the coordinates"
+    return sum(1 << (row * size + col) for row, col in coordinates)
 
 
 class WinningDetector:
     """
     detect the winning patterns for non-terminal nodes
 
+    The patterns are bitmasks, every pattern is checked
+    by a few bitwise operations on the bitmasks of the players.
+
     params
     ------
     size : int,
@@ -27,8 +49,6 @@ class WinningDetector:
     def __init__(self, size, length):
         self.size = size
         self.length = length
-        self._winning_pattern_1 = []
-        self._winning_pattern_2 = []
         self.__generate_winning_patterns()
 
     def detect(self, node):
@@ -49,85 +69,379 @@ class WinningDetector:
         if node.terminated:
             result = [0, 0, 0]
             result[node.winner] = 1
-        else:
-            result = list(map(sum, zip(self._check_winning_1(node),
-                                       self._check_winning_2(node))))
-        return result
+            return result
+        mask_1, mask_2 = node.masks
+        return self.detect_masks(mask_1, mask_2, node.turn)
+
+    def detect_masks(self, mask_1, mask_2, turn):
+        """
+        detect the number of winner patterns of a non-terminal position
+
+        params
+        ------
+        mask_1, mask_2 : int,
+            the bitmasks of player 1 and player -1
+        turn : 1 or -1,
+            the player to move
+
+        returns
+        -------
+        draw_win_lose : [int, int, int]
+            the winning patterns' number of Draw, MAX and MIN
+
+        """
+        one_step = [0,
+                    self._count_one_step(mask_1, mask_2),
+                    self._count_one_step(mask_2, mask_1)]
+
+        # not the move
+        one_step[-turn] = max(0, one_step[-turn] - 1)
+
+        return [0,
+                one_step[1] + self._count_two_steps(mask_1, mask_2),
+                one_step[-1] + self._count_two_steps(mask_2, mask_1)]
+
+    def detect_many(self, positions):
+        """
+        detect the number of winner patterns of many non-terminal positions,
+        every pattern is loaded once and checked against all the positions
+
+        params
+        ------
+        positions : iterable of (int, int, 1 or -1),
+            (mask_1, mask_2, turn) of every position, see detect_masks
+
+        returns
+        -------
+        results : list of [int, int, int]
+            the winning patterns' number of Draw, MAX and MIN of every position
+
+        """
+        positions = list(positions)
+        # (own, not own, other) for both players of every position
+        players = [(mask_1, ~mask_1, mask_2, mask_2, ~mask_2, mask_1)
+                   for mask_1, mask_2, _ in positions]
+        one_step = [[0, 0] for _ in positions]
+        for line in self._winning_pattern_1:
+            for counts, (own_1, not_1, other_1, own_2, not_2, other_2) in zip(
+                    one_step, players):
+                # the only space not marked by the player should be empty
+                rest = line & not_1
+                if rest and not rest & (rest - 1) and not rest & other_1:
+                    counts[0] += 1
+                rest = line & not_2
+                if rest and not rest & (rest - 1) and not rest & other_2:
+                    counts[1] += 1
+
+        two_steps = [[0, 0] for _ in positions]
+        occupied = [mask_1 | mask_2 for mask_1, mask_2, _ in positions]
+        for ends, middle in self._winning_pattern_2:
+            for counts, (mask_1, mask_2, _), marks in zip(two_steps, positions,
+                                                          occupied):
+                if marks & ends:
+                    continue
+                if mask_1 & middle == middle:
+                    counts[0] += 1
+                elif mask_2 & middle == middle:
+                    counts[1] += 1
+
+        results = []
+        for (_, _, turn), (one_1, one_2), (two_1, two_2) in zip(
+                positions, one_step, two_steps):
+            # not the move
+            if turn > 0:
+                one_2 = max(0, one_2 - 1)
+            else:
+                one_1 = max(0, one_1 - 1)
+            results.append([0, one_1 + two_1, one_2 + two_2])
+        return results
 
     def count_winning_path(self, node):
         "return the number of possible winning path"
+        mask_1, mask_2 = node.masks
         result = [0, 0, 0]
-        for player in (-1, 1):
-            player_indices = node.coordinates.get(player, set())
-            opposite_indices = node.coordinates.get(-player, set())
-            for pattern in self._winning_pattern_1:
-                if player_indices & pattern and not opposite_indices & pattern:
-                    result[player] += 1
+        for line in self._winning_pattern_1:
+            if line & mask_1 and not line & mask_2:
+                result[1] += 1
+            elif line & mask_2 and not line & mask_1:
+                result[-1] += 1
         return result
 
+    def create_counter(self, node, two_steps=True):
+        """
+        return a ThreatCounter of the node,
+        to be updated by moves instead of detecting every node from scratch
+
+        """
+        mask_1, mask_2 = node.masks
+        return ThreatCounter(self.size, self.length, mask_1, mask_2, two_steps)
+
     def __generate_winning_patterns(self):
-        "generate the winning patterns of the game in specified size and length"
-        for row, col in product(range(self.size), range(self.size)):
-            for delta_row, delta_col in DIRECTIONS:
-                pattern_1, pattern_2 = self.__generate_winning_index(
-                    row, col, delta_row, delta_col)
-
-                if self.__check_pattern_validation(pattern_1):
-                    self._winning_pattern_1.append(pattern_1)
-
-                if self.__check_pattern_validation(pattern_2):
-                    pattern_2 = self.__convert_pattern_2(pattern_2)
-                    self._winning_pattern_2.append(pattern_2)
-
-    def __check_pattern_validation(self, pattern):
-        return all(map(self.__check_single_coord, pattern))
-
-    def __check_single_coord(self, coord):
-        "check if the coord is valid"
-        return 0 <= coord[0] < self.size and 0 <= coord[1] < self.size
-
-    def __generate_winning_index(self, row, col, delta_row, delta_col):
-        one_step_patterns = set()  # player will win the game in one step
-        two_step_patterns = []  # player will win the game in two steps
-        for _ in range(self.length):
-            one_step_patterns.add((row, col))
-            two_step_patterns.append((row, col))
-            row += delta_row
-            col += delta_col
-        two_step_patterns.append((row, col))
-        return one_step_patterns, two_step_patterns
-
-    @staticmethod
-    def __convert_pattern_2(pattern_2):
-        "convert the format of pattern_2"
-        # empty indices, player's indices
-        return {pattern_2[0], pattern_2[-1]}, set(pattern_2[1:-1])
-
-    def _check_winning_1(self, node):
-        draw_win_lose = [0, 0, 0]
-        indices_empty = node.coordinates.get(0, set())
-
-        for player in (-1, 1):
-            indices = node.coordinates.get(player, set())
-            for pattern_1 in self._winning_pattern_1:
-                if (len(pattern_1 & indices_empty) == 1
-                        and len(pattern_1 & indices) == self.length - 1):
-                    draw_win_lose[player] += 1
+        "get the winning patterns of the game in specified size and length"
+        self._winning_pattern_1, self._winning_pattern_2 = _get_winning_patterns(
+            self.size, self.length)
 
-        # not the move
-        draw_win_lose[-node.turn] = max(0, draw_win_lose[-node.turn] - 1)
+    def _count_one_step(self, own, other):
+        "count the lines with only one empty space and the player's marks"
+        count = 0
+        not_own = ~own
+        for line in self._winning_pattern_1:
+            # the only space not marked by the player should be empty
+            rest = line & not_own
+            if rest and not rest & (rest - 1) and not rest & other:
+                count += 1
+        return count
+
+    def _count_two_steps(self, own, other):
+        "count the lines with the player's marks in the middle and empty ends"
+        count = 0
+        occupied = own | other
+        for ends, middle in self._winning_pattern_2:
+            if own & middle == middle and not occupied & ends:
+                count += 1
+        return count
+
+
+@lru_cache(maxsize=None)
+def _get_detector(size, length):
+    "return the shared WinningDetector of the game in specified size and length"
+    return WinningDetector(size, length)
+
+
+def evaluate_node(node):
+    """
+    estimate the score of a non-terminal node,
+    by its winning patterns and possible winning paths of both players
+
+    params
+    ------
+    node : Node,
+        the node to evaluate
+
+    returns
+    -------
+    score : float,
+        the estimated score, between -1 and 1 exclusively,
+        positive means MAX has the advantage
 
-        return draw_win_lose
+    """
+    detector = _get_detector(node.size, node.length)
+    _, win, lose = detector.detect(node)
+    _, paths_max, paths_min = detector.count_winning_path(node)
 
-    def _check_winning_2(self, node):
-        draw_win_lose = [0, 0, 0]
-        indices_empty = node.coordinates.get(0, set())
+    # the winning patterns are more important than the paths
+    patterns = (win - lose) / (win + lose + 1)
+    paths = (paths_max - paths_min) / (paths_max + paths_min + 1)
+    return (2 * patterns + paths) / 4
+
+
+@lru_cache(maxsize=None)
+def _get_two_step_lines(size, length):
+    """
+    return the indices of the longer lines passing through every bit
+    in their middles and at their ends
+
+    """
+    middles_through = [[] for _ in range(size * size)]
+    ends_through = [[] for _ in range(size * size)]
+    for index, line in enumerate(get_winning_lines(size, length + 1).coordinates):
+        for row, col in line[1:-1]:
+            middles_through[row * size + col].append(index)
+        for row, col in (line[0], line[-1]):
+            ends_through[row * size + col].append(index)
+    return (tuple(map(tuple, middles_through)), tuple(map(tuple, ends_through)),
+            len(get_winning_lines(size, length + 1).masks))
+
+
+class ThreatCounter:
+    """
+    count the marks of both players on every winning line,
+    updated by make and unmake in O(lines through the cell) per move
+
+    params
+    ------
+    size : int,
+        the size of the game board
+    length : int,
+        the length of the winning path
+    mask_1, mask_2 : int,
+        the bitmasks of player 1 and player -1 of the initial position
+    two_steps : bool,
+        count the patterns winning in two steps or not, see WinningDetector
+
+    attributes
+    ----------
+    threats : {1: set, -1: set},
+        the indices of lines with (length - 1) marks of the player
+        and an empty space, the player wins in one step on these lines
+    winner : 1, -1 or 0,
+        the player with a complete line, 0 if none
+
+    """
+
+    def __init__(self, size, length, mask_1=0, mask_2=0, two_steps=True):
+        self.size = size
+        self.length = length
+        self.two_steps = two_steps
+        self._lines = get_winning_lines(size, length)
+        n_lines = len(self._lines.masks)
+
+        # index by player, 1 or -1
+        self._counts = [None, [0] * n_lines, [0] * n_lines]
+        self._open = [None, 0, 0]
+        self._complete = [None, 0, 0]
+        self.threats = {1: set(), -1: set()}
+
+        self._middles_through, self._ends_through, n_long = _get_two_step_lines(
+            size, length)
+        self._middles = [None, [0] * n_long, [0] * n_long]
+        self._ends = [0] * n_long
+        self._two_steps = [None, 0, 0]
+
+        self.make_masks(mask_1, mask_2)
+
+    @property
+    def winner(self):
+        "the player with a complete line, 0 if none"
+        if self._complete[1]:
+            return 1
+        if self._complete[-1]:
+            return -1
+        return 0
+
+    def make(self, bit, player):
+        "put a mark of the player on the bit"
+        own = self._counts[player]
+        other = self._counts[-player]
+        threats = self.threats[player]
+        length = self.length
+        for index in self._lines.lines_through[bit]:
+            count = own[index]
+            own[index] = count + 1
+            if other[index]:
+                if not count:
+                    # the line is blocked for the opposite player
+                    self._open[-player] -= 1
+                    if other[index] == length - 1:
+                        self.threats[-player].discard(index)
+                continue
+            if not count:
+                self._open[player] += 1
+            if count == length - 2:
+                threats.add(index)
+            elif count == length - 1:
+                threats.discard(index)
+                self._complete[player] += 1
+
+        if self.two_steps:
+            self._update_two_steps(bit, player, 1)
+
+    def unmake(self, bit, player):
+        "remove the mark of the player from the bit"
+        if self.two_steps:
+            self._update_two_steps(bit, player, -1)
+
+        own = self._counts[player]
+        other = self._counts[-player]
+        threats = self.threats[player]
+        length = self.length
+        for index in self._lines.lines_through[bit]:
+            count = own[index] - 1
+            own[index] = count
+            if other[index]:
+                if not count:
+                    # the line is open for the opposite player again
+                    self._open[-player] += 1
+                    if other[index] == length - 1:
+                        self.threats[-player].add(index)
+                continue
+            if not count:
+                self._open[player] -= 1
+            if count == length - 2:
+                threats.discard(index)
+            elif count == length - 1:
+                threats.add(index)
+                self._complete[player] -= 1
+
+    def make_masks(self, mask_1, mask_2):
+        "put the marks of the bitmasks of player 1 and player -1"
+        for player, mask in ((1, mask_1), (-1, mask_2)):
+            while mask:
+                lowest = mask & -mask
+                self.make(lowest.bit_length() - 1, player)
+                mask ^= lowest
+
+    def unmake_masks(self, mask_1, mask_2):
+        "remove the marks of the bitmasks of player 1 and player -1"
+        for player, mask in ((1, mask_1), (-1, mask_2)):
+            while mask:
+                lowest = mask & -mask
+                self.unmake(lowest.bit_length() - 1, player)
+                mask ^= lowest
+
+    def _update_two_steps(self, bit, player, delta):
+        "update the patterns winning in two steps by adding or removing a mark"
+        middles = self._middles
+        ends = self._ends
+        for index in self._middles_through[bit]:
+            before = self._check_two_steps(index)
+            middles[player][index] += delta
+            self._add_two_steps(before, self._check_two_steps(index))
+        for index in self._ends_through[bit]:
+            before = self._check_two_steps(index)
+            ends[index] += delta
+            self._add_two_steps(before, self._check_two_steps(index))
+
+    def _check_two_steps(self, index):
+        "return the player winning in two steps on the longer line, 0 if none"
+        if self._ends[index]:
+            return 0
+        if self._middles[1][index] == self.length - 1:
+            return 1
+        if self._middles[-1][index] == self.length - 1:
+            return -1
+        return 0
+
+    def _add_two_steps(self, before, after):
+        if before != after:
+            if before:
+                self._two_steps[before] -= 1
+            if after:
+                self._two_steps[after] += 1
+
+    def get_threat_bits(self, player, empty):
+        "return the bitmask of the empty spaces winning the game for the player"
+        masks = self._lines.masks
+        bits = 0
+        for index in self.threats[player]:
+            bits |= masks[index]
+        return bits & empty
+
+    def detect(self, turn):
+        """
+        detect the number of winner patterns, the same as WinningDetector.detect
+        of a non-terminal position, requires two_steps
+
+        params
+        ------
+        turn : 1 or -1,
+            the player to move
+
+        returns
+        -------
+        draw_win_lose : [int, int, int]
+            the winning patterns' number of Draw, MAX and MIN
+
+        """
+        one_step = [0, len(self.threats[1]), len(self.threats[-1])]
+
+        # not the move
+        one_step[-turn] = max(0, one_step[-turn] - 1)
 
-        for player in (-1, 1):
-            indices = node.coordinates.get(player, set())
-            for for_empty, for_player in self._winning_pattern_2:
-                if (len(for_empty & indices_empty) == 2
-                        and len(for_player & indices) == self.length - 1):
-                    draw_win_lose[player] += 1
+        return [0,
+                one_step[1] + self._two_steps[1],
+                one_step[-1] + self._two_steps[-1]]
 
-        return draw_win_lose
+    def count_winning_path(self):
+        "return the number of possible winning path, see WinningDetector"
+        return [0, self._open[1], self._open[-1]]
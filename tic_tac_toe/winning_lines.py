@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:12:40 2026
+
+The shared registry of winning lines
+
+Every (size, length) pair is generated once per process,
+and shared by all the nodes, trees and winning detectors.
+
+"""
+from functools import lru_cache
+from itertools import product
+
+
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (-1, 1)]
+
+
+class WinningLines:
+    """
+    all the winning lines of a game board
+
+    params
+    ------
+    size : int,
+        the size of the game board
+    length : int,
+        the winning number of marks in a horizontal, vertical, or diagonal row
+
+    attributes
+    ----------
+    coordinates : tuple of tuple,
+        the coordinates (row, col) of every line, from its start to its end
+    masks : tuple of int,
+        the bitmask of every line, the cell (row, col) is the bit (row * size + col)
+    lines_through : tuple of tuple of int,
+        the indices of lines passing through every bit of the board
+    masks_through : tuple of tuple of int,
+        the bitmasks of lines passing through every bit of the board
+
+    """
+
+    def __init__(self, size, length):
+        self.size = size
+        self.length = length
+        self.coordinates = tuple(self.__generate_coordinates())
+        self.masks = tuple(map(self.__to_mask, self.coordinates))
+
+        lines_through = [[] for _ in range(size * size)]
+        for index, coordinates in enumerate(self.coordinates):
+            for row, col in coordinates:
+                lines_through[row * size + col].append(index)
+        self.lines_through = tuple(map(tuple, lines_through))
+        self.masks_through = tuple(tuple(self.masks[x] for x in indices)
+                                   for indices in self.lines_through)
+
+    def __repr__(self):
+        return (f'{type(self).__name__}(size={self.size}, length={self.length}, '
+                f'lines={len(self.masks)})')
+
+    def __generate_coordinates(self):
+        "generate lines starting from every cell in every direction"
+        for row, col in product(range(self.size), range(self.size)):
+            for delta_row, delta_col in DIRECTIONS:
+                line = tuple((row + delta_row * ind, col + delta_col * ind)
+                             for ind in range(self.length))
+                if all(map(self.__check_single_coord, line)):
+                    yield line
+
+    def __check_single_coord(self, coord):
+        "check if the coord is valid"
+        return 0 <= coord[0] < self.size and 0 <= coord[1] < self.size
+
+    def __to_mask(self, coordinates):
+        return sum(1 << (row * self.size + col) for row, col in coordinates)
+
+    def check_winner(self, mask):
+        "return True if the bitmask of a player covers any line"
+        return any(mask & line == line for line in self.masks)
+
+
+@lru_cache(maxsize=None)
+def get_winning_lines(size, length):
+    """
+    return the shared WinningLines of the given size and length
+
+    params
+    ------
+    size : int,
+        the size of the game board
+    length : int,
+        the winning number of marks in a horizontal, vertical, or diagonal row
+
+    returns
+    -------
+    winning_lines : WinningLines,
+        the same instance for the same size and length
+
+    """
+    return WinningLines(size, length)